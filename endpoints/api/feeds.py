@@ -1,25 +1,40 @@
+import asyncio
+import base64
+import binascii
+import html
+from contextlib import suppress
 from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
-from quart import Blueprint, current_app, request, jsonify
+from quart import Blueprint, Response, current_app, request, jsonify, websocket
 from quart_rate_limiter import rate_limit
 
 from services.data_manager import DataManager
+from services.live_updates import LiveClient, LiveHub
+from services.storage_backend import StorageBackend
+from utility.compression import Compressor
+from utility.response_cache import ResponseCache, compute_etag
 
 
 feeds_api = Blueprint("feeds_api", __name__, url_prefix="/api/feeds")
 
+# Message envoyé aux clients en direct quand rien d'autre n'est parti depuis `heartbeat` secondes
+LIVE_PING = '{"type":"ping"}'
+
 
 @feeds_api.route("/categories")
 @rate_limit(10, timedelta(seconds=60))
 async def get_categories():
     try:
-        data_manager = DataManager(current_app.config_quart)
-        categories = await data_manager.get_categories()
+        db = current_app.config_quart['database']
 
-        return jsonify({
-            'success': True,
-            'categories': categories
-        })
+        async def build():
+            return {
+                'success': True,
+                'categories': await db.get_categories()
+            }
+
+        return await _cached_response(('categories',), build, db.status_generation)
     except Exception as e:
         current_app.config_quart['logger'].error(f"Error getting categories: {e}")
         return jsonify({
@@ -34,37 +49,341 @@ async def get_latest():
     try:
         limit = request.args.get('limit', default=100, type=int)
         limit = min(max(limit, 1), 1000)
+        categories = _split_param(request.args.get('category'))
+        types = _split_param(request.args.get('type'))
 
-        data_manager = DataManager(current_app.config_quart)
-        latest_entries = await data_manager.get_latest_entries(limit)
+        try:
+            before = _decode_cursor(request.args.get('before'))
+            since = _decode_cursor(request.args.get('since'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid cursor'
+            }), 400
+
+        db = current_app.config_quart['database']
+
+        async def build():
+            # Lu avant la page : une entrée insérée entre les deux sera renvoyée en double par /changes, jamais perdue
+            changes_cursor = await db.get_last_entry_seq()
+            latest_entries = await db.get_entries_page(limit, categories, types, before, since)
+
+            # next_cursor : page suivante (plus ancienne), None quand l'historique est épuisé
+            # latest_cursor : à repasser en `since` pour ne récupérer que les nouvelles entrées
+            next_cursor = None
+            if len(latest_entries) == limit and not since:
+                next_cursor = _encode_cursor(latest_entries[-1])
+
+            if latest_entries:
+                latest_cursor = _encode_cursor(latest_entries[0])
+            else:
+                latest_cursor = _encode_cursor({'published_ts': since[0], 'seq': since[1]}) if since else None
+
+            return {
+                'success': True,
+                'entries': latest_entries,
+                'count': len(latest_entries),
+                'next_cursor': next_cursor,
+                'latest_cursor': latest_cursor,
+                'changes_cursor': changes_cursor
+            }
+
+        cache_key = ('latest', limit, tuple(sorted(categories)), tuple(sorted(types)), before, since)
+        return await _cached_response(cache_key, build, db.generation)
+    except Exception as e:
+        current_app.config_quart['logger'].error(f"Error getting latest entries: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
+
+@feeds_api.route("/changes")
+@rate_limit(30, timedelta(seconds=60))
+async def get_changes():
+    try:
+        since = request.args.get('since', type=int)
+        limit = request.args.get('limit', default=500, type=int)
+        limit = min(max(limit, 1), 1000)
+        categories = _split_param(request.args.get('category'))
+        types = _split_param(request.args.get('type'))
+
+        # Base interrogée directement : une erreur doit donner un 500, pas une liste vide
+        # qui ferait avancer le curseur au-delà d'entrées jamais renvoyées
+        db = current_app.config_quart['database']
+
+        # Sans curseur : rien à rattraper, on donne seulement la position courante
+        if since is None:
+            return jsonify({
+                'success': True,
+                'entries': [],
+                'count': 0,
+                'cursor': await db.get_last_entry_seq(),
+                'has_more': False
+            })
+
+        last_seq = await db.get_last_entry_seq()
+        entries = await db.get_new_entries_since(since, limit, categories, types)
+        has_more = len(entries) == limit
+
+        # Page complète : on reprend après la dernière entrée renvoyée. Sinon, tout ce qui précède
+        # last_seq a été vu, y compris les entrées écartées par les filtres : le curseur avance quand même
+        cursor = entries[-1]['seq'] if entries else since
+        if not has_more:
+            cursor = max(cursor, last_seq)
 
         return jsonify({
             'success': True,
-            'entries': latest_entries,
-            'count': len(latest_entries)
+            'entries': entries,
+            'count': len(entries),
+            'cursor': cursor,
+            'has_more': has_more
         })
     except Exception as e:
-        current_app.config_quart['logger'].error(f"Error getting latest entries: {e}")
+        current_app.config_quart['logger'].error(f"Error getting changes: {e}")
         return jsonify({
             'success': False,
             'error': 'Internal server error'
         }), 500
 
 
-@feeds_api.route("/status")
-@rate_limit(5, timedelta(seconds=60))
-async def get_status():
+@feeds_api.route("/search")
+@rate_limit(30, timedelta(seconds=60))
+async def search():
     try:
+        query = request.args.get('q', default='').strip()
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Missing search query'
+            }), 400
+
+        db = current_app.config_quart['database']
+        if not db.search_enabled:
+            return jsonify({
+                'success': False,
+                'error': 'Search unavailable'
+            }), 503
+
+        limit = request.args.get('limit', default=20, type=int)
+        limit = min(max(limit, 1), 100)
+        offset = request.args.get('offset', default=0, type=int)
+        offset = min(max(offset, 0), 1000)
+        categories = _split_param(request.args.get('category'))
+        types = _split_param(request.args.get('type'))
+
         data_manager = DataManager(current_app.config_quart)
-        status = await data_manager.get_status()
+        results = await data_manager.search_entries(query, limit, offset, categories, types)
+
+        for result in results:
+            result['title_snippet'] = _highlight(result['title_snippet'])
+            result['snippet'] = _highlight(result['snippet'])
 
         return jsonify({
             'success': True,
-            'status': status
+            'query': query,
+            'entries': results,
+            'count': len(results),
+            'next_offset': offset + limit if len(results) == limit else None
         })
+    except Exception as e:
+        current_app.config_quart['logger'].error(f"Error searching entries: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
+
+@feeds_api.route("/entry/<int:seq>")
+@rate_limit(60, timedelta(seconds=60))
+async def get_entry(seq: int):
+    """Entrée complète : les listes ne renvoient que summary_preview, le corps est chargé à l'ouverture."""
+    try:
+        db = current_app.config_quart['database']
+        entry = await db.get_entry(seq)
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'error': 'Entry not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'entry': entry
+        })
+    except Exception as e:
+        current_app.config_quart['logger'].error(f"Error getting entry: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
+
+@feeds_api.route("/status")
+@rate_limit(5, timedelta(seconds=60))
+async def get_status():
+    try:
+        db = current_app.config_quart['database']
+
+        async def build():
+            return {
+                'success': True,
+                'status': await db.get_status()
+            }
+
+        return await _cached_response(('status',), build, db.status_generation)
     except Exception as e:
         current_app.config_quart['logger'].error(f"Error getting status: {e}")
         return jsonify({
             'success': False,
             'error': 'Internal server error'
         }), 500
+
+
+@feeds_api.websocket("/live")
+async def live():
+    """
+    Mises à jour en direct : le client envoie ses filtres ({"category": "...", "type": "..."},
+    à tout moment), le serveur pousse après chaque cycle les nouvelles entrées correspondantes
+    et le statut. Un message "ping" est envoyé en l'absence d'activité.
+    """
+    background_manager = current_app.config_quart.get('background_manager')
+    hub: Optional[LiveHub] = background_manager.live_hub if background_manager else None
+    if hub is None or not hub.enabled:
+        await websocket.close(1013, 'Live updates unavailable')
+        return
+
+    await websocket.accept()
+    client: Optional[LiveClient] = None
+    receiver: Optional[asyncio.Task] = None
+    try:
+        # Inscription après l'acceptation : un échec de la poignée de main ne laisse pas de client orphelin
+        client = hub.subscribe()
+        if client is None:
+            await websocket.close(1013, 'Too many live clients')
+            return
+
+        receiver = asyncio.create_task(_receive_filters(client))
+        while True:
+            try:
+                message = await asyncio.wait_for(client.queue.get(), hub.heartbeat)
+            except asyncio.TimeoutError:
+                message = LIVE_PING
+
+            if message is None:
+                await websocket.close(4008, 'Client too slow')
+                return
+
+            try:
+                await asyncio.wait_for(websocket.send(message), hub.send_timeout)
+            except asyncio.TimeoutError:
+                hub.evict(client)
+    finally:
+        if receiver is not None:
+            receiver.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await receiver
+        if client is not None:
+            hub.unsubscribe(client)
+
+
+async def _receive_filters(client: LiveClient):
+    while True:
+        data = await websocket.receive()
+        try:
+            filters = current_app.json.loads(data)
+        except ValueError:
+            continue
+        if not isinstance(filters, dict):
+            continue
+        categories, types = filters.get('category'), filters.get('type')
+        client.set_filters(
+            _split_param(categories) if isinstance(categories, str) else [],
+            _split_param(types) if isinstance(types, str) else []
+        )
+
+
+async def _cached_response(cache_key: Tuple, build: Callable[[], Awaitable[Dict]], generation: int) -> Response:
+    """
+    Réponse JSON servie depuis le cache tant que les données n'ont pas changé, sinon construite
+    par build() puis mise en cache. generation est celle dont dépend la réponse (generation pour
+    les entrées, status_generation pour le statut et les catégories), lue avant l'appel :
+    une écriture pendant build() invalide la réponse construite. build() interroge la base
+    directement : une erreur remonte en 500 au lieu de mettre en cache les valeurs de repli
+    de DataManager.
+    Un client qui renvoie l'ETag courant dans If-None-Match reçoit un 304 sans corps, les autres
+    la version compressée négociée, calculée une seule fois par réponse en cache.
+    """
+    cache: ResponseCache = current_app.config_quart['response_cache']
+    compressor: Compressor = current_app.config_quart['compressor']
+
+    cached = cache.get(cache_key, generation)
+    if cached is None:
+        body = current_app.json.encode(await build())
+        cached = (body, compute_etag(body))
+        cache.put(cache_key, generation, *cached)
+    body, etag = cached
+
+    encoding = compressor.negotiate(request.accept_encodings, len(body))
+    if _etag_matches(etag):
+        response = current_app.response_class(status=304)
+    else:
+        if encoding:
+            compressed = cache.get_variant(cache_key, encoding)
+            if compressed is None:
+                compressed = compressor.compress(body, encoding)
+                cache.add_variant(cache_key, encoding, compressed)
+            body = compressed
+        response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    # Chaque représentation compressée a son propre ETag fort
+    response.set_etag(f'{etag}-{encoding}' if encoding else etag)
+    response.vary.add('Accept-Encoding')
+    # Le navigateur peut garder la réponse mais doit la revalider à chaque fois
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _etag_matches(etag: str) -> bool:
+    """If-None-Match désigne la réponse courante, quel que soit l'encodage de la copie du client."""
+    if_none_match = request.if_none_match
+    return if_none_match.star_tag or any(
+        tag.split('-')[0] == etag for tag in if_none_match.as_set(include_weak=True)
+    )
+
+
+def _split_param(value: Optional[str]) -> List[str]:
+    """Paramètre de filtre à valeurs multiples séparées par des virgules."""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _encode_cursor(entry: Dict) -> str:
+    """Curseur opaque (published_ts, seq) d'une entrée."""
+    raw = f"{entry['published_ts']}:{entry['seq']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        published_ts, seq = raw.split(':')
+        return int(published_ts), int(seq)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    """
+    Extrait prêt à afficher : le texte indexé est déjà sans balises (summary_text), il est
+    échappé et les termes trouvés sont entourés de <mark>.
+    """
+    if not snippet:
+        return ''
+    text = html.escape(' '.join(snippet.split()))
+    return text.replace(StorageBackend.SNIPPET_START, '<mark>').replace(StorageBackend.SNIPPET_END, '</mark>')
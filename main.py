@@ -7,7 +7,6 @@ from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from urllib.parse import parse_qsl
 
-import aiohttp
 from dotenv import load_dotenv
 
 from quart import Quart, Response, request, send_file, websocket
@@ -23,8 +22,11 @@ from starlette.middleware.trustedhost import TrustedHostMiddleware
 from router.base_bp import base_bp
 from endpoints.api.feeds import feeds_api
 from services.background_tasks import BackgroundTaskManager
-from services.database import Database
+from services.storage_backend import create_database
+from services.http_pool import HttpPool
+from utility.compression import Compressor
 from utility.orjson_provider import OrjsonProvider
+from utility.response_cache import ResponseCache
 from utility.utils import ProxyHeadersMiddleware, get_client_ip, get_client_ip_ws, mask_query
 
 load_dotenv()
@@ -41,7 +43,7 @@ config_quart['dev_bot'] = dev_bot
 
 app = Quart(__name__, static_folder=config_quart['static_folder'])
 app = cors(app, websocket_cors_enabled=not config_quart['dev_bot'])
-app.json = OrjsonProvider(app)
+app.json = OrjsonProvider(app, indent=config_quart['dev_bot'] and config_quart.get('json_indent', False))
 Minify(app=app, js=True, cssless=False, remove_console=True)
 
 rate_limiter = RateLimiter(app)
@@ -87,17 +89,31 @@ app.register_blueprint(feeds_api)
 @app.before_serving
 async def startup():
     # Initialize database
-    db_path = config_quart['storage'].get('db_file', 'data/feeds.db')
-    database = Database(db_path)
-    await database.connect()
+    database = create_database(config_quart['storage'])
     config_quart['database'] = database
 
-    session_aio = aiohttp.ClientSession()
-    config_quart['session'] = session_aio
-
+    # Créé avant la connexion à la base : le pool de parsing forke ses workers
+    # avant que la base ne démarre ses threads
     background_manager = BackgroundTaskManager(config_quart)
     config_quart['background_manager'] = background_manager
-    await background_manager.start(session_aio)
+    await database.connect()
+
+    # Réponses de l'API servies depuis la mémoire entre deux cycles de fetch
+    config_quart['response_cache'] = ResponseCache(config_quart.get('api_cache'))
+    config_quart['compressor'] = Compressor(config_quart.get('compression'))
+
+    # Sessions HTTP séparées : polling des flux et webhooks Discord
+    http_config = config_quart.get('http', {})
+    http_pools = {
+        'feeds': HttpPool('feeds', http_config.get('feeds')),
+        'discord': HttpPool('discord', http_config.get('discord'))
+    }
+    config_quart['http_pools'] = http_pools
+    session_aio = await http_pools['feeds'].open()
+    discord_session = await http_pools['discord'].open()
+    config_quart['session'] = session_aio
+
+    await background_manager.start(session_aio, discord_session)
 
 @app.after_serving
 async def shutdown():
@@ -105,7 +121,8 @@ async def shutdown():
         await config_quart['background_manager'].stop()
     if 'database' in config_quart:
         await config_quart['database'].close()
-    await config_quart['session'].close()
+    for http_pool in config_quart.get('http_pools', {}).values():
+        await http_pool.close()
 
 @app.before_request
 async def log_start():
@@ -163,6 +180,27 @@ async def set_security_headers(response: Response):
     await log_end(response)
     return response
 
+@app.after_request
+async def compress_response(response: Response):
+    """Compresse les réponses JSON qui ne le sont pas déjà (celles du cache arrivent compressées)."""
+    compressor = config_quart.get('compressor')
+    if (
+        compressor is None
+        or not compressor.enabled
+        or response.status_code != 200
+        or response.mimetype != app.json.mimetype
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    body = await response.get_data()
+    encoding = compressor.negotiate(request.accept_encodings, len(body))
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.set_data(compressor.compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route("/favicon.ico")
 async def favicon():
     try:
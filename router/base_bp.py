@@ -21,6 +21,7 @@ async def health_check():
     try:
         config = current_app.config_quart
         background_manager = config.get('background_manager')
+        http_pools = config.get('http_pools', {})
 
         status = {
             'status': 'healthy',
@@ -29,7 +30,13 @@ async def health_check():
             'services': {
                 'background_tasks': background_manager.running if background_manager else False,
                 'discord_notifications': config.get('discord', {}).get('enabled', False)
-            }
+            },
+            'discord_outbox': background_manager.discord_notifier.get_metrics() if background_manager else None,
+            'retention': background_manager.retention.get_stats() if background_manager else None,
+            'live': background_manager.live_hub.get_stats() if background_manager else None,
+            'fetcher': background_manager.rss_fetcher.get_stats() if background_manager else None,
+            'response_cache': config['response_cache'].get_stats() if 'response_cache' in config else None,
+            'http_pools': {name: http_pool.get_stats() for name, http_pool in http_pools.items()}
         }
 
         return jsonify(status)
@@ -3,6 +3,9 @@ import logging
 from datetime import datetime, timezone
 
 from services.data_manager import DataManager
+from services.feed_scheduler import FeedScheduler
+from services.live_updates import LiveHub
+from services.retention import RetentionManager
 from services.rss_fetcher import RSSFetcher
 from services.discord_notifier import DiscordNotifier
 
@@ -14,19 +17,30 @@ class BackgroundTaskManager:
         self.rss_fetcher = RSSFetcher(config)
         self.data_manager = DataManager(config)
         self.discord_notifier = DiscordNotifier(config)
+        self.scheduler = FeedScheduler(config)
+        self.retention = RetentionManager(config)
+        self.live_hub = LiveHub(config)
         self.running = False
         self.task = None
-        self._first_run = True
         self._last_fetch_time = None
 
-    async def start(self, session):
+    async def start(self, session, discord_session=None):
         if self.running:
             self.logger.warning("Background tasks already running")
             return
 
         await self.rss_fetcher.set_session(session)
-        await self.discord_notifier.set_session(session)
+        await self.discord_notifier.set_session(discord_session or session)
+
+        db = self.config.get('database')
+        self.rss_fetcher.load_validators(await db.get_feed_validators())
+        self.rss_fetcher.load_feed_health(await db.get_feed_health())
+        # Tous les flux sont dus immédiatement, le scheduler étale ensuite les échéances
+        self.scheduler.add_all(self.rss_fetcher.get_feed_targets())
+        await self.live_hub.start()
         self.running = True
+        self.discord_notifier.start_worker()
+        self.retention.start()
         self.task = asyncio.create_task(self._run_tasks())
         self.logger.info("Background tasks started")
 
@@ -44,74 +58,84 @@ class BackgroundTaskManager:
                 await self.task
             except asyncio.CancelledError:
                 pass
+        await self.discord_notifier.stop_worker()
+        await self.retention.stop()
+        self.rss_fetcher.close()
         self.logger.info("Background tasks stopped")
 
     async def _run_tasks(self):
-        fetch_interval = self.config.get('fetch_interval', 300)
-
         while self.running:
             try:
-                await self._fetch_all_feeds()
-                await asyncio.sleep(fetch_interval)
+                due_feeds = self.scheduler.pop_due()
+                if due_feeds:
+                    await self._fetch_feeds(due_feeds)
+                    continue
+
+                delay = self.scheduler.seconds_until_next()
+                await asyncio.sleep(delay if delay is not None else self.config.get('fetch_interval', 300))
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error in background task: {e}")
                 await asyncio.sleep(60)
 
-    async def _fetch_all_feeds(self):
-        self.logger.info("Starting RSS feeds fetch")
+    async def _fetch_feeds(self, targets):
+        self.logger.info(f"Starting RSS feeds fetch ({len(targets)} feeds due)")
         start_time = datetime.now(timezone.utc)
+        outcomes = {}
 
         try:
-            feeds_data = await self.rss_fetcher.fetch_all_feeds()
-
-            if feeds_data:
-                db = self.config.get('database')
-
-                # Get entries before save for Discord notifications
-                new_entries_for_discord = []
-                if not self._first_run and self.discord_notifier.is_enabled():
-                    # Get current entry IDs from database
-                    current_entries = await db.get_latest_entries(10000)
-                    existing_ids = {e['id'] for e in current_entries}
-
-                    # Find new entries
-                    for category_key, category_data in feeds_data.items():
-                        for feed_key, feed_data in category_data.get('feeds', {}).items():
-                            feed_info = feed_data.get('feed_info', {})
-                            for entry in feed_data.get('entries', []):
-                                if entry.get('id') not in existing_ids:
-                                    enriched = entry.copy()
-                                    enriched['category'] = category_data.get('category', category_key)
-                                    enriched['category_key'] = category_key
-                                    enriched['feed_name'] = feed_info.get('name', feed_key)
-                                    enriched['feed_type'] = feed_info.get('type', 'unknown')
-                                    new_entries_for_discord.append(enriched)
-
-                # Save to database
-                new_count = await db.save_feeds_data(feeds_data)
-                duration = (datetime.now(timezone.utc) - start_time).total_seconds()
-                self.logger.info(f"RSS feeds fetch completed in {duration:.2f}s ({new_count} new entries)")
-
-                # Send Discord notifications
-                if new_entries_for_discord:
-                    self.logger.info(f"Sending Discord notifications for {len(new_entries_for_discord)} entries")
-                    results = await self.discord_notifier.notify_new_entries(new_entries_for_discord)
-                    self.logger.info(f"Discord notifications: {results['sent']} sent, {results['failed']} failed")
-
-            else:
-                self.logger.warning("No feeds data retrieved")
-
-            if self._first_run:
-                self._first_run = False
-                self.logger.info("First run completed, future new entries will trigger notifications")
+            feeds_data, fetch_outcomes = await self.rss_fetcher.fetch_feeds(targets)
+            db = self.config.get('database')
+
+            # feeds_data a une clé par catégorie demandée, mais seuls les flux au contenu modifié y figurent
+            has_updates = any(category_data['feeds'] for category_data in feeds_data.values())
+            new_entries = []
+            if has_updates:
+                # Save to database, new entries are queued in the Discord outbox in the same transaction
+                new_entries = await db.save_feeds_data(feeds_data, notify=self.discord_notifier.is_enabled())
+                self.rss_fetcher.update_cache(feeds_data)
+            outcomes = fetch_outcomes
+
+            # Persist failure tracking of the feeds actually requested this cycle; without new
+            # content, only feeds whose failure count or last error changed are written
+            fetched_targets = [
+                target for target, outcome in fetch_outcomes.items()
+                if outcome['status'] != 'skipped'
+            ]
+            feed_health = self.rss_fetcher.get_feed_health(fetched_targets, changed_only=not has_updates)
+            if feed_health:
+                await db.update_feed_health(feed_health)
+                self.rss_fetcher.mark_feed_health_saved(feed_health)
+
+            duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+            self.logger.info(f"RSS feeds fetch completed in {duration:.2f}s ({len(new_entries)} new entries)")
+
+            if new_entries:
+                # Discord notifications are delivered from the outbox by the notifier's own worker
+                self.discord_notifier.wake()
+
+                # Navigateurs connectés en direct : nouvelles entrées et statut, lus une fois pour tous
+                await self.live_hub.publish_updates()
 
             self._last_fetch_time = datetime.now(timezone.utc).isoformat()
 
         except Exception as e:
             self.logger.error(f"Error fetching RSS feeds: {e}")
 
+        finally:
+            # Un flux dont la sauvegarde a échoué est replanifié comme une erreur
+            for target in targets:
+                outcome = outcomes.get(target, {'status': 'failed', 'hints': {}})
+                try:
+                    self.scheduler.reschedule(target, outcome['status'], outcome['hints'])
+                except Exception as e:
+                    # Un flux mal replanifié ne doit pas priver le reste du lot de son échéance
+                    self.logger.error(f"Error rescheduling feed {target}: {e}")
+
+    async def _fetch_all_feeds(self):
+        await self._fetch_feeds(self.rss_fetcher.get_feed_targets())
+
     async def force_fetch(self):
         if not self.running:
             self.logger.warning("Background tasks not running, cannot force fetch")
@@ -0,0 +1,89 @@
+"""
+Disjoncteur (circuit breaker) pour les sources de flux.
+Après N échecs consécutifs, la source n'est plus appelée pendant un délai
+de refroidissement, puis une seule requête de test (half-open) décide de
+la reprise.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 600):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[str] = None
+        self.last_success_at: Optional[str] = None
+        self._probe_in_flight = False
+
+    def is_available(self) -> bool:
+        """Indique si une requête peut partir, sans modifier l'état."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return self.retry_in() == 0
+        return not self._probe_in_flight
+
+    def begin(self):
+        """Signale le départ d'une requête (prend le créneau de test si le circuit est entrouvert)."""
+        if self.state == self.OPEN and self.retry_in() == 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self.last_success_at = datetime.now(timezone.utc).isoformat()
+
+    def record_failure(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        self.last_error_at = datetime.now(timezone.utc).isoformat()
+        self._probe_in_flight = False
+
+        # Un test raté en half-open rouvre le circuit pour un nouveau délai
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.time()
+
+    def retry_in(self) -> float:
+        """Secondes restantes avant qu'une requête de test soit autorisée (0 si disponible)."""
+        if self.state != self.OPEN or self.opened_at is None:
+            return 0
+        return max(self.opened_at + self.cooldown - time.time(), 0)
+
+    def restore(self, failures: int, last_error: Optional[str], last_error_at: Optional[str],
+                last_success_at: Optional[str]):
+        """Recharge un état persisté ; le circuit est rouvert si le seuil était atteint."""
+        self.failures = failures or 0
+        self.last_error = last_error
+        self.last_error_at = last_error_at
+        self.last_success_at = last_success_at
+
+        if self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            try:
+                self.opened_at = datetime.fromisoformat(last_error_at).timestamp()
+            except (TypeError, ValueError):
+                self.opened_at = time.time()
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'last_error': self.last_error,
+            'last_error_at': self.last_error_at,
+            'last_success_at': self.last_success_at
+        }
@@ -1,15 +1,15 @@
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from services.database import Database
+from services.storage_backend import StorageBackend
 
 
 class DataManager:
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger('it_monitoring.data_manager')
-        self.db: Database = config.get('database')
+        self.db: StorageBackend = config.get('database')
 
     async def save_feeds_data(self, feeds_data: Dict) -> bool:
         """Save feeds data to database."""
@@ -29,6 +29,15 @@ class DataManager:
             self.logger.error(f"Error getting latest entries: {e}")
             return []
 
+    async def search_entries(self, query: str, limit: int = 20, offset: int = 0,
+                             categories: Optional[List[str]] = None, types: Optional[List[str]] = None) -> List[Dict]:
+        """Full-text search over entries."""
+        try:
+            return await self.db.search_entries(query, limit, offset, categories, types)
+        except Exception as e:
+            self.logger.error(f"Error searching entries: {e}")
+            return []
+
     async def get_categories(self) -> Dict:
         """Get all categories."""
         try:
@@ -47,7 +56,10 @@ class DataManager:
                 'total_categories': 0,
                 'total_feeds': 0,
                 'total_entries': 0,
-                'last_update': None
+                'entries_by_category': {},
+                'entries_by_type': {},
+                'last_update': None,
+                'feeds': []
             }
 
     def get_new_entries(self, old_data: Dict, new_data: Dict) -> List[Dict]:
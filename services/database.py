@@ -1,32 +1,136 @@
 import aiosqlite
+import asyncio
 import json
 import logging
+import re
+import sqlite3
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from services.feed_parser import published_timestamp, summary_text, text_preview
+from services.storage_backend import StorageBackend
 
-class Database:
-    def __init__(self, db_path: str = "data/feeds.db"):
+
+class Database(StorageBackend):
+    # Entries per multi-row INSERT (8 parameters each, well below SQLite's variable limit)
+    INSERT_BATCH_SIZE = 100
+
+    # Most recent matches ranked by a search
+    SEARCH_WINDOW = 2000
+
+    # Default storage profile, overridden by the storage.sqlite section of config.json
+    SQLITE_DEFAULTS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -65536,
+        'busy_timeout': 5000,
+        'auto_vacuum': 'INCREMENTAL',
+        'read_connections': 4
+    }
+
+    def __init__(self, db_path: str = "data/feeds.db", sqlite_config: Optional[Dict] = None):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
         self.logger = logging.getLogger('it_monitoring.database')
+        self.sqlite_config = {**self.SQLITE_DEFAULTS, **(sqlite_config or {})}
+        # Single writer connection (fetch cycles, outbox, feed health)
         self._connection: Optional[aiosqlite.Connection] = None
+        # Serialises the writer's transactions. The fetch cycle saves in one transaction spanning
+        # several awaits, and the outbox worker, feed health and retention share the connection:
+        # without the lock, their commit() or rollback() would end a half-written save cycle
+        self._write_lock = asyncio.Lock()
+        # Read-only connections for the API, WAL lets them read while the writer commits
+        self._readers: Optional[asyncio.Queue] = None
+        self._reader_connections: List[aiosqlite.Connection] = []
+        # False when the SQLite build has no FTS5 module
+        self.search_enabled = False
 
     async def connect(self):
-        """Initialize database connection and create tables."""
+        """Initialize database connections and create tables."""
         self._connection = await aiosqlite.connect(self.db_path)
         self._connection.row_factory = aiosqlite.Row
+        await self._apply_pragmas(self._connection, writer=True)
+        await self._apply_auto_vacuum()
         await self._create_tables()
-        self.logger.info(f"Database connected: {self.db_path}")
+        await self._migrate()
+
+        read_connections = self.sqlite_config['read_connections']
+        if read_connections > 0:
+            self._readers = asyncio.Queue()
+            for _ in range(read_connections):
+                reader = await aiosqlite.connect(f'file:{self.db_path.resolve()}?mode=ro', uri=True)
+                reader.row_factory = aiosqlite.Row
+                await self._apply_pragmas(reader, writer=False)
+                self._reader_connections.append(reader)
+                self._readers.put_nowait(reader)
+
+        self.logger.info(
+            f"Database connected: {self.db_path} (journal_mode={self.sqlite_config['journal_mode']}, "
+            f"{read_connections} read connections)"
+        )
 
     async def close(self):
-        """Close database connection."""
+        """Close database connections."""
+        for reader in self._reader_connections:
+            await reader.close()
+        self._reader_connections = []
+        self._readers = None
+
         if self._connection:
             await self._connection.close()
             self._connection = None
             self.logger.info("Database connection closed")
 
+    async def _apply_pragmas(self, connection: aiosqlite.Connection, writer: bool):
+        """Apply the storage profile; journal_mode is persistent and only set by the writer."""
+        if writer:
+            cursor = await connection.execute(f"PRAGMA journal_mode = {self.sqlite_config['journal_mode']}")
+            journal_mode = (await cursor.fetchone())[0]
+            if journal_mode.lower() != str(self.sqlite_config['journal_mode']).lower():
+                self.logger.warning(f"SQLite journal_mode {self.sqlite_config['journal_mode']} unavailable, using {journal_mode}")
+            await connection.execute(f"PRAGMA synchronous = {self.sqlite_config['synchronous']}")
+        else:
+            await connection.execute('PRAGMA query_only = ON')
+
+        await connection.execute(f"PRAGMA busy_timeout = {int(self.sqlite_config['busy_timeout'])}")
+        await connection.execute(f"PRAGMA mmap_size = {int(self.sqlite_config['mmap_size'])}")
+        await connection.execute(f"PRAGMA cache_size = {int(self.sqlite_config['cache_size'])}")
+
+    async def _apply_auto_vacuum(self):
+        """
+        Set auto_vacuum (INCREMENTAL lets retention give freed pages back to the filesystem).
+        The mode only changes after a full VACUUM, run once here (instantaneous on a new database).
+        """
+        modes = {'NONE': 0, 'FULL': 1, 'INCREMENTAL': 2}
+        mode = str(self.sqlite_config['auto_vacuum']).upper()
+        cursor = await self._connection.execute('PRAGMA auto_vacuum')
+        if (await cursor.fetchone())[0] == modes[mode]:
+            return
+
+        await self._connection.execute(f'PRAGMA auto_vacuum = {mode}')
+        cursor = await self._connection.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'")
+        if (await cursor.fetchone())[0]:
+            self.logger.info(f"Switching SQLite auto_vacuum to {mode}, running VACUUM")
+        # Also needed by a new file: setting journal_mode has already written its header
+        await self._connection.execute('VACUUM')
+
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a read-only connection, or the writer connection when no read pool is configured."""
+        if self._readers is None:
+            yield self._connection
+            return
+
+        connection = await self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put_nowait(connection)
+
     async def _create_tables(self):
         """Create database tables if they don't exist."""
         await self._connection.executescript('''
@@ -44,6 +148,13 @@ class Database:
                 name TEXT NOT NULL,
                 url TEXT NOT NULL,
                 type TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                last_error_at TEXT,
+                last_success_at TEXT,
                 FOREIGN KEY (category_id) REFERENCES categories(id),
                 UNIQUE(category_id, key)
             );
@@ -54,204 +165,1018 @@ class Database:
                 entry_id TEXT NOT NULL,
                 title TEXT,
                 link TEXT,
-                summary TEXT,
+                summary_preview TEXT,
                 author TEXT,
                 published TEXT,
+                published_ts INTEGER,
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (feed_id) REFERENCES feeds(id),
                 UNIQUE(feed_id, entry_id)
             );
 
-            CREATE INDEX IF NOT EXISTS idx_entries_published ON entries(published DESC);
+            -- Full summaries, read one at a time: list queries scan entries without loading them
+            CREATE TABLE IF NOT EXISTS entry_bodies (
+                entry_id INTEGER PRIMARY KEY,
+                summary TEXT,
+                summary_text TEXT,
+                FOREIGN KEY (entry_id) REFERENCES entries(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entry_id INTEGER NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                delivered_to TEXT NOT NULL DEFAULT '[]',
+                last_error TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (entry_id) REFERENCES entries(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS feed_stats (
+                feed_id INTEGER PRIMARY KEY,
+                entries_count INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (feed_id) REFERENCES feeds(id)
+            );
+
             CREATE INDEX IF NOT EXISTS idx_entries_feed_id ON entries(feed_id);
             CREATE INDEX IF NOT EXISTS idx_entries_entry_id ON entries(entry_id);
+            CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox(status, next_attempt_at);
+
+            CREATE TRIGGER IF NOT EXISTS trg_entries_bodies_delete AFTER DELETE ON entries
+            BEGIN
+                DELETE FROM entry_bodies WHERE entry_id = OLD.id;
+            END;
         ''')
         await self._connection.commit()
 
-    async def get_or_create_category(self, key: str, name: str) -> int:
-        """Get or create a category, return its ID."""
+    async def _migrate(self):
+        """Add columns introduced after the initial schema to existing databases."""
+        cursor = await self._connection.execute('PRAGMA table_info(feeds)')
+        feed_columns = {row['name'] for row in await cursor.fetchall()}
+
+        new_columns = {
+            'etag': 'TEXT',
+            'last_modified': 'TEXT',
+            'content_hash': 'TEXT',
+            'consecutive_failures': 'INTEGER NOT NULL DEFAULT 0',
+            'last_error': 'TEXT',
+            'last_error_at': 'TEXT',
+            'last_success_at': 'TEXT'
+        }
+        for column, definition in new_columns.items():
+            if column not in feed_columns:
+                await self._connection.execute(f'ALTER TABLE feeds ADD COLUMN {column} {definition}')
+
+        cursor = await self._connection.execute('PRAGMA table_info(entries)')
+        entry_columns = {row['name'] for row in await cursor.fetchall()}
+        if 'published_ts' not in entry_columns:
+            await self._connection.execute('ALTER TABLE entries ADD COLUMN published_ts INTEGER')
+        await self._backfill_published_ts()
+        if 'summary_preview' not in entry_columns:
+            await self._connection.execute('ALTER TABLE entries ADD COLUMN summary_preview TEXT')
+        if 'summary' in entry_columns:
+            await self._move_summaries('summary_text' in entry_columns)
+        await self._backfill_summary_text()
+
+        await self._create_stats_triggers()
+        await self._create_search_index()
+
+        # Sort key of the latest entries: an index range scan, without a temporary sort
+        await self._connection.execute('DROP INDEX IF EXISTS idx_entries_published')
+        await self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_entries_published_ts ON entries(published_ts DESC, id DESC)'
+        )
+
+        await self._connection.commit()
+
+    async def _create_stats_triggers(self):
+        """
+        Maintain feed_stats.entries_count from triggers on entries, so status queries never count entries.
+        When the triggers are first installed, the counters are rebuilt in the same transaction.
+        """
         cursor = await self._connection.execute(
-            'SELECT id FROM categories WHERE key = ?', (key,)
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_entries_stats_insert'"
         )
-        row = await cursor.fetchone()
+        if await cursor.fetchone():
+            return
 
-        if row:
-            return row['id']
+        await self._connection.execute('DELETE FROM feed_stats')
+        await self._connection.execute('''
+            INSERT INTO feed_stats (feed_id, entries_count)
+            SELECT feed_id, COUNT(*) FROM entries GROUP BY feed_id
+        ''')
+        await self._connection.execute('''
+            CREATE TRIGGER trg_entries_stats_insert AFTER INSERT ON entries
+            BEGIN
+                INSERT INTO feed_stats (feed_id, entries_count) VALUES (NEW.feed_id, 1)
+                ON CONFLICT(feed_id) DO UPDATE SET entries_count = entries_count + 1;
+            END
+        ''')
+        await self._connection.execute('''
+            CREATE TRIGGER trg_entries_stats_delete AFTER DELETE ON entries
+            BEGIN
+                UPDATE feed_stats SET entries_count = entries_count - 1 WHERE feed_id = OLD.feed_id;
+            END
+        ''')
 
+    async def _create_search_index(self):
+        """
+        FTS5 index over entry title, summary text and author. External content: the text is read back
+        through the entries_search view (entries joined with entry_bodies), the index only stores
+        tokens, and triggers keep it in sync with every write. The summary is indexed as plain
+        text, so markup (tag names, attributes, URLs in href) never matches.
+        """
         cursor = await self._connection.execute(
-            'INSERT INTO categories (key, name) VALUES (?, ?)',
-            (key, name)
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries_fts'"
         )
-        await self._connection.commit()
-        return cursor.lastrowid
+        exists = await cursor.fetchone() is not None
 
-    async def get_or_create_feed(self, category_id: int, key: str, feed_info: Dict) -> int:
-        """Get or create a feed, return its ID."""
+        if not exists:
+            await self._connection.execute('''
+                CREATE VIEW IF NOT EXISTS entries_search AS
+                SELECT e.id, e.title, b.summary_text, e.author
+                FROM entries e
+                JOIN entry_bodies b ON b.entry_id = e.id
+            ''')
+            try:
+                await self._connection.execute('''
+                    CREATE VIRTUAL TABLE entries_fts USING fts5(
+                        title, summary_text, author,
+                        content='entries_search', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2',
+                        prefix='2 3'
+                    )
+                ''')
+            except sqlite3.OperationalError as e:
+                self.logger.warning(f"Full-text search disabled, FTS5 unavailable: {e}")
+                return
+
+            await self._connection.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+            self.logger.info("Full-text search index built")
+
+        # An entry is indexed once its body is stored (_insert_entries writes entries first), and
+        # removed before the entries row goes, while trg_entries_bodies_delete has not run yet
+        await self._connection.executescript('''
+            CREATE TRIGGER IF NOT EXISTS trg_entries_fts_insert AFTER INSERT ON entry_bodies
+            BEGIN
+                INSERT INTO entries_fts (rowid, title, summary_text, author)
+                SELECT e.id, e.title, NEW.summary_text, e.author FROM entries e WHERE e.id = NEW.entry_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_entries_fts_delete BEFORE DELETE ON entries
+            BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title, summary_text, author)
+                SELECT 'delete', OLD.id, OLD.title, b.summary_text, OLD.author
+                FROM entry_bodies b WHERE b.entry_id = OLD.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_entries_fts_update AFTER UPDATE OF summary_text ON entry_bodies
+            BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, title, summary_text, author)
+                SELECT 'delete', e.id, e.title, OLD.summary_text, e.author FROM entries e WHERE e.id = OLD.entry_id;
+                INSERT INTO entries_fts (rowid, title, summary_text, author)
+                SELECT e.id, e.title, NEW.summary_text, e.author FROM entries e WHERE e.id = NEW.entry_id;
+            END;
+        ''')
+        self.search_enabled = True
+
+    async def _move_summaries(self, has_summary_text: bool):
+        """
+        Move the summaries of a database created before entry_bodies out of the entries table.
+        The search index read them from entries: it is dropped here and rebuilt over
+        entries_search by _create_search_index. Dropping the columns rewrites entries once.
+        """
+        drop_text = 'ALTER TABLE entries DROP COLUMN summary_text;' if has_summary_text else ''
+        await self._connection.executescript(f'''
+            BEGIN;
+            DROP TRIGGER IF EXISTS trg_entries_fts_insert;
+            DROP TRIGGER IF EXISTS trg_entries_fts_delete;
+            DROP TRIGGER IF EXISTS trg_entries_fts_update;
+            DROP TABLE IF EXISTS entries_fts;
+            INSERT OR IGNORE INTO entry_bodies (entry_id, summary, summary_text)
+            SELECT id, summary, {'summary_text' if has_summary_text else 'NULL'} FROM entries;
+            ALTER TABLE entries DROP COLUMN summary;
+            {drop_text}
+            COMMIT;
+        ''')
+        self.logger.info("Moved entry summaries to entry_bodies")
+
+    async def _backfill_published_ts(self):
+        """Compute published_ts for entries stored before the column existed."""
         cursor = await self._connection.execute(
-            'SELECT id FROM feeds WHERE category_id = ? AND key = ?',
-            (category_id, key)
+            'SELECT id, published, created_at FROM entries WHERE published_ts IS NULL'
         )
-        row = await cursor.fetchone()
+        rows = await cursor.fetchall()
+        if not rows:
+            return
 
-        if row:
-            # Update feed info
-            await self._connection.execute(
-                'UPDATE feeds SET name = ?, url = ?, type = ? WHERE id = ?',
-                (feed_info['name'], feed_info['url'], feed_info['type'], row['id'])
+        # Unparsable dates fall back to the ingestion time, as for new entries
+        updates = [
+            (published_timestamp(row['published']) or published_timestamp(row['created_at']) or 0, row['id'])
+            for row in rows
+        ]
+        await self._connection.executemany('UPDATE entries SET published_ts = ? WHERE id = ?', updates)
+        self.logger.info(f"Backfilled published_ts of {len(updates)} entries")
+
+    async def _backfill_summary_text(self):
+        """
+        Compute summary_text and summary_preview for entries stored before the columns existed,
+        by batches of ids.
+        """
+        last_id, updated = 0, 0
+        while True:
+            cursor = await self._connection.execute('''
+                SELECT e.id, b.summary FROM entries e
+                JOIN entry_bodies b ON b.entry_id = e.id
+                WHERE (b.summary_text IS NULL OR e.summary_preview IS NULL) AND e.id > ?
+                ORDER BY e.id
+                LIMIT 1000
+            ''', (last_id,))
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+
+            texts = [(summary_text(row['summary']), row['id']) for row in rows]
+            await self._connection.executemany('UPDATE entry_bodies SET summary_text = ? WHERE entry_id = ?', texts)
+            await self._connection.executemany(
+                'UPDATE entries SET summary_preview = ? WHERE id = ?',
+                [(text_preview(text), entry_id) for text, entry_id in texts]
             )
-            await self._connection.commit()
-            return row['id']
+            last_id = rows[-1]['id']
+            updated += len(rows)
+
+        if updated:
+            self.logger.info(f"Backfilled summary_text of {updated} entries")
+
+    async def save_feeds_data(self, feeds_data: Dict, notify: bool = False) -> List[Tuple[int, str]]:
+        """
+        Save feeds data to database in a single transaction. Returns the (feed_id, entry_id) pairs newly inserted.
+        With notify, new entries of feeds that already had entries are queued for Discord
+        (the first fetch of a feed only fills its history).
+        """
+        async with self._write_lock:
+            timestamp = datetime.now(timezone.utc).isoformat()
+
+            try:
+                # Categories and feeds: bulk UPDATE, then INSERT only the missing rows
+                # (an upsert would consume an AUTOINCREMENT id on every cycle)
+                await self._connection.executemany(
+                    'UPDATE categories SET name = ?, last_update = ? WHERE key = ?',
+                    [(category_data['category'], timestamp, category_key) for category_key, category_data in feeds_data.items()]
+                )
+                category_ids = await self._get_category_ids(list(feeds_data))
+                missing_categories = [
+                    (category_key, category_data['category'], timestamp)
+                    for category_key, category_data in feeds_data.items()
+                    if category_key not in category_ids
+                ]
+                if missing_categories:
+                    await self._connection.executemany(
+                        'INSERT INTO categories (key, name, last_update) VALUES (?, ?, ?)', missing_categories
+                    )
+                    category_ids = await self._get_category_ids(list(feeds_data))
+
+                feed_rows = []
+                for category_key, category_data in feeds_data.items():
+                    for feed_key, feed_data in category_data.get('feeds', {}).items():
+                        feed_info = feed_data['feed_info']
+                        feed_rows.append((
+                            feed_info['name'], feed_info['url'], feed_info['type'],
+                            feed_info.get('etag'), feed_info.get('last_modified'), feed_info.get('content_hash'),
+                            category_ids[category_key], feed_key
+                        ))
+                await self._connection.executemany('''
+                    UPDATE feeds SET name = ?, url = ?, type = ?, etag = ?, last_modified = ?, content_hash = ?
+                    WHERE category_id = ? AND key = ?
+                ''', feed_rows)
+                feed_ids = await self._get_feed_ids(list(category_ids.values()))
+                # Same values, reordered as (category_id, key, name, ...) for the INSERT
+                missing_feeds = [row[-2:] + row[:-2] for row in feed_rows if row[-2:] not in feed_ids]
+                if missing_feeds:
+                    await self._connection.executemany('''
+                        INSERT INTO feeds (category_id, key, name, url, type, etag, last_modified, content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', missing_feeds)
+                    feed_ids = await self._get_feed_ids(list(category_ids.values()))
+
+                entries = []
+                for category_key, category_data in feeds_data.items():
+                    for feed_key, feed_data in category_data.get('feeds', {}).items():
+                        feed_id = feed_ids[(category_ids[category_key], feed_key)]
+                        entries.extend((feed_id, entry) for entry in feed_data.get('entries', []))
+
+                # Feeds fetched for the first time only fill their history, checked before inserting
+                notify_feeds = await self._feeds_with_entries({feed_id for feed_id, _ in entries}) if notify else set()
+                inserted = await self._insert_entries(entries)
+
+                outbox_rows = [(row_id,) for row_id, feed_id, _ in inserted if feed_id in notify_feeds]
+                if outbox_rows:
+                    await self._connection.executemany(
+                        'INSERT OR IGNORE INTO notification_outbox (entry_id) VALUES (?)', outbox_rows
+                    )
 
+                await self._connection.commit()
+            except Exception:
+                await self._connection.rollback()
+                raise
+
+            # last_update always changes; entry listings only when rows were added
+            self._bump_generation(entries=bool(inserted or missing_categories or missing_feeds))
+            new_entries = [(feed_id, entry_id) for _, feed_id, entry_id in inserted]
+            self.logger.info(f"Saved {len(new_entries)} new entries to database")
+            return new_entries
+
+    async def _get_category_ids(self, keys: List[str]) -> Dict[str, int]:
+        """Map category keys to their id."""
+        if not keys:
+            return {}
+        placeholders = ', '.join('?' * len(keys))
         cursor = await self._connection.execute(
-            'INSERT INTO feeds (category_id, key, name, url, type) VALUES (?, ?, ?, ?, ?)',
-            (category_id, key, feed_info['name'], feed_info['url'], feed_info['type'])
+            f'SELECT id, key FROM categories WHERE key IN ({placeholders})', keys
         )
-        await self._connection.commit()
-        return cursor.lastrowid
+        return {row['key']: row['id'] for row in await cursor.fetchall()}
 
-    async def add_entry(self, feed_id: int, entry: Dict) -> bool:
-        """Add an entry if it doesn't exist. Returns True if new entry was added."""
-        try:
-            await self._connection.execute('''
-                INSERT OR IGNORE INTO entries (feed_id, entry_id, title, link, summary, author, published)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                feed_id,
-                entry.get('id', ''),
-                entry.get('title', ''),
-                entry.get('link', ''),
-                entry.get('summary', ''),
-                entry.get('author', ''),
-                entry.get('published', '')
-            ))
+    async def _get_feed_ids(self, category_ids: List[int]) -> Dict[Tuple[int, str], int]:
+        """Map (category_id, feed key) to feed id for the given categories."""
+        if not category_ids:
+            return {}
+        placeholders = ', '.join('?' * len(category_ids))
+        cursor = await self._connection.execute(
+            f'SELECT id, category_id, key FROM feeds WHERE category_id IN ({placeholders})', category_ids
+        )
+        return {(row['category_id'], row['key']): row['id'] for row in await cursor.fetchall()}
+
+    async def _feeds_with_entries(self, feed_ids: set) -> set:
+        """Subset of feed_ids that already have at least one stored entry."""
+        if not feed_ids:
+            return set()
+        placeholders = ', '.join('?' * len(feed_ids))
+        cursor = await self._connection.execute(f'''
+            SELECT f.id FROM feeds f
+            WHERE f.id IN ({placeholders})
+            AND EXISTS (SELECT 1 FROM entries e WHERE e.feed_id = f.id)
+        ''', list(feed_ids))
+        return {row['id'] for row in await cursor.fetchall()}
+
+    async def _insert_entries(self, entries: List[Tuple[int, Dict]]) -> List[Tuple[int, int, str]]:
+        """
+        Insert (feed_id, entry) pairs, ignoring entries already stored, then the bodies of the
+        rows actually inserted. Returns their (entries.id, feed_id, entry_id), read back with RETURNING.
+        """
+        inserted = []
+
+        for start in range(0, len(entries), self.INSERT_BATCH_SIZE):
+            batch = entries[start:start + self.INSERT_BATCH_SIZE]
+            params = []
+            bodies: Dict[Tuple[int, str], Tuple[str, str]] = {}
+            for feed_id, entry in batch:
+                published_ts = entry.get('published_ts') or published_timestamp(entry.get('published'))
+                text = entry.get('summary_text')
+                if text is None:
+                    text = summary_text(entry.get('summary'))
+                params.extend((
+                    feed_id,
+                    entry.get('id', ''),
+                    entry.get('title', ''),
+                    entry.get('link', ''),
+                    entry.get('summary_preview') or text_preview(text),
+                    entry.get('author', ''),
+                    entry.get('published', ''),
+                    published_ts if published_ts is not None else int(time.time())
+                ))
+                # First occurrence wins, as with INSERT OR IGNORE
+                bodies.setdefault((feed_id, entry.get('id', '')), (entry.get('summary', ''), text))
+
+            placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?)'] * len(batch))
+            cursor = await self._connection.execute(f'''
+                INSERT OR IGNORE INTO entries (
+                    feed_id, entry_id, title, link, summary_preview, author, published, published_ts
+                )
+                VALUES {placeholders}
+                RETURNING id, feed_id, entry_id
+            ''', params)
+            rows = [(row['id'], row['feed_id'], row['entry_id']) for row in await cursor.fetchall()]
+            await self._connection.executemany(
+                'INSERT INTO entry_bodies (entry_id, summary, summary_text) VALUES (?, ?, ?)',
+                [(seq, *bodies[(feed_id, entry_id)]) for seq, feed_id, entry_id in rows]
+            )
+            inserted.extend(rows)
+
+        return inserted
+
+    async def claim_notifications(self, limit: int) -> List[Dict]:
+        """
+        Claim a batch of due notifications from the outbox, with their entry data.
+        Claimed rows move to 'sending' and their attempt counter is incremented.
+        """
+        async with self._write_lock:
+            cursor = await self._connection.execute('''
+                SELECT
+                    o.id as outbox_id,
+                    o.attempts,
+                    o.delivered_to,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    b.summary,
+                    e.author,
+                    e.published,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM notification_outbox o
+                JOIN entries e ON o.entry_id = e.id
+                LEFT JOIN entry_bodies b ON b.entry_id = e.id
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                WHERE o.status = 'pending' AND o.next_attempt_at <= ?
+                ORDER BY o.id
+                LIMIT ?
+            ''', (time.time(), limit))
+
+            rows = [dict(row) for row in await cursor.fetchall()]
+            if not rows:
+                return []
+
+            await self._connection.executemany(
+                "UPDATE notification_outbox SET status = 'sending', attempts = attempts + 1 WHERE id = ?",
+                [(row['outbox_id'],) for row in rows]
+            )
             await self._connection.commit()
-            return self._connection.total_changes > 0
-        except Exception as e:
-            self.logger.error(f"Error adding entry: {e}")
-            return False
-
-    async def save_feeds_data(self, feeds_data: Dict) -> int:
-        """Save feeds data to database. Returns count of new entries."""
-        new_entries_count = 0
-        timestamp = datetime.now(timezone.utc).isoformat()
-
-        for category_key, category_data in feeds_data.items():
-            category_id = await self.get_or_create_category(
-                category_key,
-                category_data['category']
+
+            for row in rows:
+                row['attempts'] += 1
+                row['delivered_to'] = json.loads(row['delivered_to'])
+            return rows
+
+    async def mark_notification_delivered(self, outbox_id: int, delivered_to: List[str]):
+        """Record the webhooks already delivered, so a retry never sends to them twice."""
+        async with self._write_lock:
+            await self._connection.execute(
+                'UPDATE notification_outbox SET delivered_to = ? WHERE id = ?',
+                (json.dumps(delivered_to), outbox_id)
             )
+            await self._connection.commit()
 
-            # Update category timestamp
+    async def complete_notification(self, outbox_id: int):
+        """Remove a fully delivered notification from the outbox."""
+        async with self._write_lock:
+            await self._connection.execute('DELETE FROM notification_outbox WHERE id = ?', (outbox_id,))
+            await self._connection.commit()
+
+    async def retry_notification(self, outbox_id: int, delay: float, error: str, give_up: bool = False):
+        """Schedule another attempt after delay seconds, or mark the notification as failed."""
+        async with self._write_lock:
             await self._connection.execute(
-                'UPDATE categories SET last_update = ? WHERE id = ?',
-                (timestamp, category_id)
+                'UPDATE notification_outbox SET status = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                ('failed' if give_up else 'pending', time.time() + delay, error, outbox_id)
+            )
+            await self._connection.commit()
+
+    async def requeue_stale_notifications(self) -> int:
+        """Put back notifications left in 'sending' by a crash or restart. Returns their count."""
+        async with self._write_lock:
+            cursor = await self._connection.execute(
+                "UPDATE notification_outbox SET status = 'pending' WHERE status = 'sending'"
             )
+            await self._connection.commit()
+            return cursor.rowcount
+
+    async def get_outbox_state(self) -> Dict:
+        """Number of notifications waiting in the outbox and epoch time of the next due one."""
+        cursor = await self._connection.execute('''
+            SELECT COUNT(*) as pending, MIN(next_attempt_at) as next_attempt_at
+            FROM notification_outbox
+            WHERE status = 'pending'
+        ''')
+        row = await cursor.fetchone()
+        return {'pending': row['pending'], 'next_attempt_at': row['next_attempt_at']}
+
+    async def get_expired_entry_ids(self, feed_type: str, cutoff_ts: Optional[int] = None,
+                                    max_rows: Optional[int] = None, keep_latest: int = 0) -> List[int]:
+        """
+        Ids of the entries of a feed type that fall outside a retention policy: published before
+        cutoff_ts, or beyond the max_rows most recent of their feed. The keep_latest most recent
+        entries of each feed are always kept, since the feed still lists them and deleting them
+        would insert (and notify) them again on the next fetch.
+        """
+        conditions = []
+        params: List = [feed_type, keep_latest]
+        if cutoff_ts is not None:
+            conditions.append('published_ts < ?')
+            params.append(cutoff_ts)
+        if max_rows is not None:
+            conditions.append('rank > ?')
+            params.append(max_rows)
+        if not conditions:
+            return []
 
-            for feed_key, feed_data in category_data.get('feeds', {}).items():
-                feed_id = await self.get_or_create_feed(
-                    category_id,
-                    feed_key,
-                    feed_data['feed_info']
+        async with self._reader() as connection:
+            cursor = await connection.execute(f'''
+                SELECT id FROM (
+                    SELECT
+                        e.id,
+                        e.published_ts,
+                        ROW_NUMBER() OVER (PARTITION BY e.feed_id ORDER BY e.published_ts DESC, e.id DESC) as rank
+                    FROM entries e
+                    JOIN feeds f ON e.feed_id = f.id
+                    WHERE f.type = ?
                 )
+                WHERE rank > ? AND ({' OR '.join(conditions)})
+                ORDER BY id
+            ''', params)
+            return [row['id'] for row in await cursor.fetchall()]
 
-                for entry in feed_data.get('entries', []):
-                    if await self.add_entry(feed_id, entry):
-                        new_entries_count += 1
+    async def delete_entries(self, entry_ids: List[int]) -> int:
+        """
+        Delete entries by id, with their abandoned notifications. Entries still waiting in the
+        outbox are kept. Returns the number of entries deleted.
+        """
+        if not entry_ids:
+            return 0
 
-        await self._connection.commit()
-        self.logger.info(f"Saved {new_entries_count} new entries to database")
-        return new_entries_count
+        placeholders = ', '.join('?' * len(entry_ids))
+        async with self._write_lock:
+            try:
+                await self._connection.execute(
+                    f"DELETE FROM notification_outbox WHERE status = 'failed' AND entry_id IN ({placeholders})",
+                    entry_ids
+                )
+                cursor = await self._connection.execute(f'''
+                    DELETE FROM entries
+                    WHERE id IN ({placeholders})
+                    AND id NOT IN (SELECT entry_id FROM notification_outbox)
+                ''', entry_ids)
+                await self._connection.commit()
+                if cursor.rowcount:
+                    self._bump_generation()
+                return cursor.rowcount
+            except Exception:
+                await self._connection.rollback()
+                raise
 
-    async def get_latest_entries(self, limit: int = 500) -> List[Dict]:
-        """Get latest entries sorted by published date."""
-        cursor = await self._connection.execute('''
-            SELECT
-                e.entry_id as id,
-                e.title,
-                e.link,
-                e.summary,
-                e.author,
-                e.published,
-                c.name as category,
-                c.key as category_key,
-                f.name as feed_name,
-                f.type as feed_type
-            FROM entries e
-            JOIN feeds f ON e.feed_id = f.id
-            JOIN categories c ON f.category_id = c.id
-            ORDER BY e.published DESC
-            LIMIT ?
-        ''', (limit,))
+    async def purge_failed_notifications(self, older_than_days: float) -> int:
+        """Delete abandoned notifications older than the given age. Returns their count."""
+        async with self._write_lock:
+            cursor = await self._connection.execute(
+                "DELETE FROM notification_outbox WHERE status = 'failed' AND created_at < datetime('now', ?)",
+                (f'-{older_than_days} days',)
+            )
+            await self._connection.commit()
+            return cursor.rowcount
+
+    async def incremental_vacuum(self, max_pages: int = 0) -> int:
+        """
+        Return up to max_pages free pages (all if 0) to the filesystem.
+        Returns the number of bytes reclaimed; always 0 unless auto_vacuum is INCREMENTAL.
+        """
+        async with self._write_lock:
+            pages_before = await self._pragma('page_count')
+            # executescript steps the pragma to completion (execute() would only free a single page)
+            await self._connection.executescript(
+                f'PRAGMA incremental_vacuum({int(max_pages)})' if max_pages else 'PRAGMA incremental_vacuum'
+            )
+            pages_after = await self._pragma('page_count')
+
+        return (pages_before - pages_after) * await self._pragma('page_size')
+
+    async def get_storage_stats(self) -> Dict:
+        """Size of the database file and of its free pages, in bytes."""
+        page_size = await self._pragma('page_size')
+        return {
+            'size_bytes': await self._pragma('page_count') * page_size,
+            'free_bytes': await self._pragma('freelist_count') * page_size
+        }
+
+    async def _pragma(self, name: str) -> int:
+        cursor = await self._connection.execute(f'PRAGMA {name}')
+        return (await cursor.fetchone())[0]
+
+    async def get_feed_validators(self) -> Dict[str, Dict]:
+        """Get the cache validators (ETag, Last-Modified, body digest) stored for each feed URL."""
+        cursor = await self._connection.execute(
+            'SELECT url, etag, last_modified, content_hash FROM feeds'
+        )
 
         rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        return {
+            row['url']: {
+                'etag': row['etag'],
+                'last_modified': row['last_modified'],
+                'content_hash': row['content_hash']
+            }
+            for row in rows
+        }
 
-    async def get_categories(self) -> Dict:
-        """Get all categories with their info."""
+    async def get_feed_health(self) -> Dict[str, Dict]:
+        """Get the persisted failure tracking of each feed URL."""
         cursor = await self._connection.execute('''
-            SELECT
-                c.key,
-                c.name,
-                c.last_update,
-                COUNT(DISTINCT f.id) as feeds_count
-            FROM categories c
-            LEFT JOIN feeds f ON c.id = f.category_id
-            GROUP BY c.id
+            SELECT url, consecutive_failures, last_error, last_error_at, last_success_at
+            FROM feeds
         ''')
 
         rows = await cursor.fetchall()
         return {
-            row['key']: {
-                'name': row['name'],
-                'last_update': row['last_update'],
-                'feeds_count': row['feeds_count']
+            row['url']: {
+                'consecutive_failures': row['consecutive_failures'],
+                'last_error': row['last_error'],
+                'last_error_at': row['last_error_at'],
+                'last_success_at': row['last_success_at']
             }
             for row in rows
         }
 
-    async def get_status(self) -> Dict:
-        """Get database status/stats."""
-        cursor = await self._connection.execute('SELECT COUNT(*) as count FROM categories')
-        categories_count = (await cursor.fetchone())['count']
+    async def update_feed_health(self, feed_health: Dict[str, Dict]):
+        """
+        Persist failure counts, last error and last success per feed URL. A feed that has
+        never been saved (e.g. failing since it was configured) has no row yet: it is created
+        from the category, key, name and type carried by its health entry.
+        """
+        async with self._write_lock:
+            if not feed_health:
+                return
 
-        cursor = await self._connection.execute('SELECT COUNT(*) as count FROM feeds')
-        feeds_count = (await cursor.fetchone())['count']
+            try:
+                await self._connection.executemany('''
+                    UPDATE feeds
+                    SET consecutive_failures = ?, last_error = ?, last_error_at = ?, last_success_at = ?
+                    WHERE url = ?
+                ''', [
+                    (
+                        health['consecutive_failures'], health['last_error'],
+                        health['last_error_at'], health['last_success_at'], url
+                    )
+                    for url, health in feed_health.items()
+                ])
 
-        cursor = await self._connection.execute('SELECT COUNT(*) as count FROM entries')
-        entries_count = (await cursor.fetchone())['count']
+                placeholders = ', '.join('?' * len(feed_health))
+                cursor = await self._connection.execute(
+                    f'SELECT url FROM feeds WHERE url IN ({placeholders})', list(feed_health)
+                )
+                saved_urls = {row['url'] for row in await cursor.fetchall()}
+                missing = [(url, health) for url, health in feed_health.items() if url not in saved_urls]
 
-        cursor = await self._connection.execute(
-            'SELECT MAX(last_update) as last_update FROM categories'
-        )
-        last_update = (await cursor.fetchone())['last_update']
+                if missing:
+                    await self._connection.executemany(
+                        'INSERT INTO categories (key, name) VALUES (?, ?) ON CONFLICT(key) DO NOTHING',
+                        list({health['category_key']: health['category'] for _, health in missing}.items())
+                    )
+                    category_ids = await self._get_category_ids(list({health['category_key'] for _, health in missing}))
+                    # The key may already exist under a previous URL of the feed
+                    await self._connection.executemany('''
+                        INSERT INTO feeds (
+                            category_id, key, name, url, type,
+                            consecutive_failures, last_error, last_error_at, last_success_at
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(category_id, key) DO UPDATE SET
+                            url = excluded.url,
+                            consecutive_failures = excluded.consecutive_failures,
+                            last_error = excluded.last_error,
+                            last_error_at = excluded.last_error_at,
+                            last_success_at = excluded.last_success_at
+                    ''', [
+                        (
+                            category_ids[health['category_key']], health['feed_key'], health['name'], url, health['type'],
+                            health['consecutive_failures'], health['last_error'],
+                            health['last_error_at'], health['last_success_at']
+                        )
+                        for url, health in missing
+                    ])
+
+                await self._connection.commit()
+            except Exception:
+                await self._connection.rollback()
+                raise
+
+            # New feed rows show up in category and type listings
+            self._bump_generation(entries=bool(missing))
+
+    async def get_latest_entries(self, limit: int = 500) -> List[Dict]:
+        """Get latest entries sorted by published date."""
+        async with self._reader() as connection:
+            cursor = await connection.execute('''
+                SELECT
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                ORDER BY e.published_ts DESC, e.id DESC
+                LIMIT ?
+            ''', (limit,))
+
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def get_entries_page(self, limit: int = 100, categories: Optional[List[str]] = None,
+                               types: Optional[List[str]] = None, before: Optional[Tuple[int, int]] = None,
+                               since: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """
+        Keyset pagination over entries, newest first, on the (published_ts, id) index.
+
+        Args:
+            limit: Maximum number of entries
+            categories: Category keys to keep (all if empty)
+            types: Feed types to keep (all if empty)
+            before: (published_ts, seq) cursor, only entries older than it
+            since: (published_ts, seq) cursor, only entries newer than it; the page then holds
+                the oldest of them, so a client catching up never skips entries
+        """
+        conditions = []
+        params: List = []
+
+        if categories:
+            conditions.append(f"c.key IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if types:
+            conditions.append(f"f.type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+        if before:
+            conditions.append('(e.published_ts, e.id) < (?, ?)')
+            params.extend(before)
+        if since:
+            conditions.append('(e.published_ts, e.id) > (?, ?)')
+            params.extend(since)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        # CROSS JOIN keeps entries as the outer loop: the filters are checked while walking the
+        # (published_ts, id) index, which stops after `limit` rows instead of sorting whole categories
+        order = 'ASC' if since else 'DESC'
+
+        async with self._reader() as connection:
+            cursor = await connection.execute(f'''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                CROSS JOIN feeds f ON e.feed_id = f.id
+                CROSS JOIN categories c ON f.category_id = c.id
+                {where}
+                ORDER BY e.published_ts {order}, e.id {order}
+                LIMIT ?
+            ''', (*params, limit))
+
+            rows = [dict(row) for row in await cursor.fetchall()]
+
+        if since:
+            rows.reverse()
+        return rows
+
+    async def search_entries(self, query: str, limit: int = 20, offset: int = 0,
+                             categories: Optional[List[str]] = None, types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Full-text search, best matches first (bm25, title weighted over summary and author).
+        Ranking is done over the SEARCH_WINDOW most recent matches, which bounds the cost of
+        very common terms. title_snippet and snippet carry SNIPPET_START / SNIPPET_END around
+        the matched terms.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+
+        conditions = ['entries_fts MATCH ?']
+        params: List = [match]
+        if categories:
+            conditions.append(f"c.key IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if types:
+            conditions.append(f"f.type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+
+        async with self._reader() as connection:
+            # 1. Rank the most recent matches: FTS5 walks its index by rowid and stops at the window
+            cursor = await connection.execute(f'''
+                SELECT seq FROM (
+                    SELECT entries_fts.rowid as seq, bm25(entries_fts, 10.0, 1.0, 2.0) as score
+                    FROM entries_fts
+                    JOIN entries e ON e.id = entries_fts.rowid
+                    JOIN feeds f ON e.feed_id = f.id
+                    JOIN categories c ON f.category_id = c.id
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY entries_fts.rowid DESC
+                    LIMIT ?
+                )
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            ''', (*params, self.SEARCH_WINDOW, limit, offset))
+            seqs = [row['seq'] for row in await cursor.fetchall()]
+            if not seqs:
+                return []
+
+            # 2. Snippets and entry data for this page only. FTS5 is driven by the rowid range,
+            #    `+` keeps it from running one MATCH per id of the IN list
+            markers = (self.SNIPPET_START, self.SNIPPET_END)
+            cursor = await connection.execute(f'''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type,
+                    snippet(entries_fts, 0, ?, ?, '…', 16) as title_snippet,
+                    snippet(entries_fts, 1, ?, ?, '…', 24) as snippet
+                FROM entries_fts
+                JOIN entries e ON e.id = entries_fts.rowid
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                WHERE entries_fts MATCH ?
+                AND entries_fts.rowid BETWEEN ? AND ?
+                AND +entries_fts.rowid IN ({', '.join('?' * len(seqs))})
+            ''', (*markers, *markers, match, min(seqs), max(seqs), *seqs))
+            rows = {row['seq']: dict(row) for row in await cursor.fetchall()}
+
+        return [rows[seq] for seq in seqs if seq in rows]
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """
+        Turn user input into an FTS5 query: every word is quoted (no operator or column syntax
+        reaches FTS5), words are ANDed, and the last one also matches as a prefix once it has
+        at least 2 characters (the prefix index covers 2 and 3 characters).
+        """
+        terms = [term.replace('"', '""') for term in query.split()]
+        if not terms:
+            return ''
+        quoted = [f'"{term}"' for term in terms]
+        # The prefix applies to the last token of the last word ("6.8" ends with token "8")
+        last_tokens = [token for token in re.split(r'\W+', terms[-1]) if token]
+        if last_tokens and len(last_tokens[-1]) >= 2:
+            quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    async def get_categories(self) -> Dict:
+        """Get all categories with their info (entry counts come from feed_stats)."""
+        async with self._reader() as connection:
+            cursor = await connection.execute('''
+                SELECT
+                    c.key,
+                    c.name,
+                    c.last_update,
+                    COUNT(f.id) as feeds_count,
+                    COALESCE(SUM(s.entries_count), 0) as entries_count
+                FROM categories c
+                LEFT JOIN feeds f ON c.id = f.category_id
+                LEFT JOIN feed_stats s ON s.feed_id = f.id
+                GROUP BY c.id
+            ''')
+
+            rows = await cursor.fetchall()
+            return {
+                row['key']: {
+                    'name': row['name'],
+                    'last_update': row['last_update'],
+                    'feeds_count': row['feeds_count'],
+                    'entries_count': row['entries_count']
+                }
+                for row in rows
+            }
+
+    async def get_status(self) -> Dict:
+        """
+        Get database status/stats. Reads one row per category and per feed, with entry counts
+        from feed_stats: the cost does not depend on the number of stored entries.
+        """
+        async with self._reader() as connection:
+            cursor = await connection.execute(
+                'SELECT COUNT(*) as count, MAX(last_update) as last_update FROM categories'
+            )
+            row = await cursor.fetchone()
+            categories_count, last_update = row['count'], row['last_update']
+
+            cursor = await connection.execute('''
+                SELECT
+                    c.key as category_key,
+                    f.key as feed_key,
+                    f.name,
+                    f.type,
+                    COALESCE(s.entries_count, 0) as entries_count,
+                    f.consecutive_failures,
+                    f.last_error,
+                    f.last_error_at,
+                    f.last_success_at
+                FROM feeds f
+                JOIN categories c ON f.category_id = c.id
+                LEFT JOIN feed_stats s ON s.feed_id = f.id
+                ORDER BY f.consecutive_failures DESC, c.key, f.key
+            ''')
+            feeds = [dict(row) for row in await cursor.fetchall()]
+
+        entries_by_category: Dict[str, int] = {}
+        entries_by_type: Dict[str, int] = {}
+        for feed in feeds:
+            entries_by_category[feed['category_key']] = entries_by_category.get(feed['category_key'], 0) + feed['entries_count']
+            entries_by_type[feed['type']] = entries_by_type.get(feed['type'], 0) + feed['entries_count']
 
         return {
             'total_categories': categories_count,
-            'total_feeds': feeds_count,
-            'total_entries': entries_count,
-            'last_update': last_update
+            'total_feeds': len(feeds),
+            'total_entries': sum(entries_by_type.values()),
+            'entries_by_category': entries_by_category,
+            'entries_by_type': entries_by_type,
+            'last_update': last_update,
+            'feeds': feeds
         }
 
-    async def get_new_entries_since(self, since: str) -> List[Dict]:
-        """Get entries added after a specific timestamp."""
-        cursor = await self._connection.execute('''
-            SELECT
-                e.entry_id as id,
-                e.title,
-                e.link,
-                e.summary,
-                e.author,
-                e.published,
-                c.name as category,
-                c.key as category_key,
-                f.name as feed_name,
-                f.type as feed_type
-            FROM entries e
-            JOIN feeds f ON e.feed_id = f.id
-            JOIN categories c ON f.category_id = c.id
-            WHERE e.created_at > ?
-            ORDER BY e.published DESC
-        ''', (since,))
+    async def get_new_entries_since(self, since_seq: int, limit: int = 500, categories: Optional[List[str]] = None,
+                                    types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get entries inserted after a sequence number (entries.id, AUTOINCREMENT so never reused),
+        in insertion order. Unlike published dates, this also catches entries published in the past.
+        """
+        conditions = ['e.id > ?']
+        params: List = [since_seq]
 
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        if categories:
+            conditions.append(f"c.key IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if types:
+            conditions.append(f"f.type IN ({', '.join('?' * len(types))})")
+            params.extend(types)
+
+        async with self._reader() as connection:
+            cursor = await connection.execute(f'''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                CROSS JOIN feeds f ON e.feed_id = f.id
+                CROSS JOIN categories c ON f.category_id = c.id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY e.id ASC
+                LIMIT ?
+            ''', (*params, limit))
+
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+
+    async def get_last_entry_seq(self) -> int:
+        """Sequence number of the last inserted entry (0 if none)."""
+        async with self._reader() as connection:
+            cursor = await connection.execute('SELECT MAX(id) as seq FROM entries')
+            return (await cursor.fetchone())['seq'] or 0
+
+    async def get_entry(self, seq: int) -> Optional[Dict]:
+        """Get one entry with its full summary (list queries only return summary_preview)."""
+        async with self._reader() as connection:
+            cursor = await connection.execute('''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    b.summary,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                LEFT JOIN entry_bodies b ON b.entry_id = e.id
+                WHERE e.id = ?
+            ''', (seq,))
+
+            row = await cursor.fetchone()
+            return dict(row) if row else None
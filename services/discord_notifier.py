@@ -6,9 +6,10 @@ import asyncio
 import logging
 import os
 import re
+import time
 import urllib.parse
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 import aiohttp
 import discord
@@ -35,6 +36,9 @@ class DiscordNotifier:
         'default': '📰'
     }
 
+    # Intervalle (secondes) de remise en file des notifications restées 'sending' après un crash
+    REQUEUE_INTERVAL = 60
+
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger('it_monitoring.discord_notifier')
@@ -42,6 +46,19 @@ class DiscordNotifier:
         self.discord_config = config.get('discord', {})
         self.enabled = self.discord_config.get('enabled', False)
         self.rate_limit_delay = self.discord_config.get('batch_delay_seconds', 2)
+        self.batch_size = self.discord_config.get('outbox_batch_size', 20)
+        self.max_attempts = self.discord_config.get('max_attempts', 5)
+        self.retry_base_delay = self.discord_config.get('retry_base_delay', 30)
+        self.poll_interval = self.discord_config.get('outbox_poll_interval', 60)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self.metrics = {
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'abandoned': 0,
+            'pending': 0
+        }
 
     async def set_session(self, session: aiohttp.ClientSession):
         """Définit la session HTTP à utiliser."""
@@ -51,6 +68,107 @@ class DiscordNotifier:
         """Vérifie si les notifications Discord sont activées."""
         return self.enabled and bool(self.discord_config.get('webhooks'))
 
+    def start_worker(self):
+        """Démarre la tâche qui vide l'outbox, indépendamment des cycles de fetch."""
+        if self._worker or not self.is_enabled():
+            return
+        self._worker = asyncio.create_task(self._consume())
+
+    async def stop_worker(self):
+        """Arrête la tâche d'envoi ; les notifications restantes restent dans l'outbox."""
+        if not self._worker:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def wake(self):
+        """Signale au worker que de nouvelles notifications attendent dans l'outbox."""
+        self._wakeup.set()
+
+    async def _consume(self):
+        db = self.config.get('database')
+        next_requeue = 0.0
+
+        while True:
+            timeout = self.poll_interval
+            try:
+                # Pas seulement au démarrage : avec PostgreSQL, les envois d'une autre instance
+                # arrêtée ne sont repris qu'une fois leur réservation expirée
+                if time.monotonic() >= next_requeue:
+                    requeued = await db.requeue_stale_notifications()
+                    if requeued:
+                        self.logger.warning(f"{requeued} interrupted Discord notifications requeued")
+                    next_requeue = time.monotonic() + self.REQUEUE_INTERVAL
+
+                batch = await db.claim_notifications(self.batch_size)
+                if batch:
+                    for notification in batch:
+                        await self._deliver(db, notification)
+                    continue
+
+                outbox_state = await db.get_outbox_state()
+                self.metrics['pending'] = outbox_state['pending']
+                if outbox_state['next_attempt_at'] is not None:
+                    timeout = min(max(outbox_state['next_attempt_at'] - time.time(), 0.1), self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error in Discord delivery worker: {e}")
+
+            # Rien de dû : attendre un réveil, le prochain retry planifié ou la prochaine remise en file
+            timeout = min(timeout, max(next_requeue - time.monotonic(), 0.1))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, db, notification: Dict):
+        """
+        Envoie une notification de l'outbox à chaque webhook concerné.
+        Chaque webhook servi est enregistré aussitôt : un retry ne le renvoie jamais.
+        """
+        delivered_to = notification['delivered_to']
+        failed = False
+
+        for webhook_config in self.discord_config.get('webhooks', []):
+            webhook_name = webhook_config.get('name') or webhook_config.get('url', '')
+            if webhook_name in delivered_to or not self._should_notify(notification, webhook_config):
+                continue
+
+            if await self._send_notification(notification, webhook_config):
+                delivered_to.append(webhook_name)
+                await db.mark_notification_delivered(notification['outbox_id'], delivered_to)
+                self.metrics['sent'] += 1
+            else:
+                failed = True
+                self.metrics['failed'] += 1
+
+            # Rate limiting entre les envois
+            await asyncio.sleep(self.rate_limit_delay)
+
+        if not failed:
+            await db.complete_notification(notification['outbox_id'])
+            return
+
+        attempts = notification['attempts']
+        give_up = attempts >= self.max_attempts
+        delay = self.retry_base_delay * 2 ** (attempts - 1)
+        await db.retry_notification(notification['outbox_id'], delay, "Webhook delivery failed", give_up)
+        if give_up:
+            self.metrics['abandoned'] += 1
+            self.logger.error(f"Giving up Discord notification for {notification['id']} after {attempts} attempts")
+        else:
+            self.metrics['retried'] += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Compteurs de livraison de l'outbox, pour le monitoring."""
+        return dict(self.metrics)
+
     def _resolve_env_vars(self, value: str) -> str:
         """Résout les variables d'environnement dans une chaîne (format ${VAR})."""
         if not value:
@@ -61,43 +179,6 @@ class DiscordNotifier:
             return os.environ.get(var_name, match.group(0))
         return re.sub(pattern, replace, value)
 
-    async def notify_new_entries(self, new_entries: List[Dict]) -> Dict[str, int]:
-        """
-        Envoie des notifications pour les nouvelles entrées.
-
-        Args:
-            new_entries: Liste des nouvelles entrées à notifier
-
-        Returns:
-            Dict avec le nombre de succès/échecs par webhook
-        """
-        if not self.is_enabled() or not new_entries:
-            return {'sent': 0, 'failed': 0}
-
-        if not self.session:
-            self.logger.error("HTTP session not initialized")
-            return {'sent': 0, 'failed': len(new_entries)}
-
-        results = {'sent': 0, 'failed': 0}
-        webhooks = self.discord_config.get('webhooks', [])
-
-        for entry in new_entries:
-            for webhook_config in webhooks:
-                if self._should_notify(entry, webhook_config):
-                    success = await self._send_notification(entry, webhook_config)
-                    if success:
-                        results['sent'] += 1
-                    else:
-                        results['failed'] += 1
-
-                    # Rate limiting entre les envois
-                    await asyncio.sleep(self.rate_limit_delay)
-
-        if results['sent'] > 0:
-            self.logger.info(f"Discord notifications sent: {results['sent']} success, {results['failed']} failed")
-
-        return results
-
     def _should_notify(self, entry: Dict, webhook_config: Dict) -> bool:
         """
         Vérifie si une entrée doit être notifiée pour ce webhook.
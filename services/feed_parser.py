@@ -0,0 +1,174 @@
+"""
+Parsing des flux RSS/Atom.
+Ces fonctions sont exécutées dans un pool de workers (processus ou threads) :
+elles doivent rester au niveau module pour être sérialisables, et ne renvoyer
+que les entrées déjà normalisées plutôt que l'objet feedparser complet.
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import feedparser
+
+# Longueur maximum de l'aperçu texte servi par les listes de l'API
+PREVIEW_LENGTH = 200
+
+
+def parse_feed(content: bytes, url: str, max_entries: int = 20) -> Dict:
+    """Parse le corps brut d'un flux et retourne ses entrées normalisées."""
+    return _process_feed(feedparser.parse(content), url, max_entries)
+
+
+def _process_feed(feed, url: str, max_entries: int = 20) -> Dict:
+    entries = []
+    for entry in feed.entries[:max_entries]:
+        published = _parse_date(entry)
+        text = summary_text(getattr(entry, 'summary', ''))
+        processed_entry = {
+            'title': getattr(entry, 'title', 'No title'),
+            'link': getattr(entry, 'link', ''),
+            'summary': getattr(entry, 'summary', ''),
+            'summary_text': text,
+            'summary_preview': text_preview(text),
+            'published': published,
+            'published_ts': published_timestamp(published),
+            'id': getattr(entry, 'id', entry.link if hasattr(entry, 'link') else ''),
+            'author': getattr(entry, 'author', ''),
+        }
+        entries.append(processed_entry)
+
+    return {
+        'status': 'updated',
+        'feed_info': {
+            'title': getattr(feed.feed, 'title', 'Unknown Feed'),
+            'description': getattr(feed.feed, 'description', ''),
+            'url': url,
+            'last_updated': datetime.now(timezone.utc).isoformat()
+        },
+        'entries': entries,
+        'ttl': _parse_ttl(feed)
+    }
+
+
+def _parse_date(entry) -> str:
+    # Essayer plusieurs champs de date (RSS et Atom)
+    date_fields = [
+        ('published_parsed', 'published'),
+        ('updated_parsed', 'updated'),
+        ('created_parsed', 'created'),
+    ]
+
+    for parsed_field, raw_field in date_fields:
+        # Essayer le champ parsé en premier
+        parsed_value = getattr(entry, parsed_field, None)
+        if parsed_value:
+            try:
+                dt = datetime(*parsed_value[:6], tzinfo=timezone.utc)
+                return dt.isoformat()
+            except (ValueError, TypeError, IndexError):
+                pass
+
+        # Essayer le champ brut
+        raw_value = getattr(entry, raw_field, None)
+        if raw_value and isinstance(raw_value, str):
+            # Essayer de parser la date brute
+            try:
+                dt = parsedate_to_datetime(raw_value)
+                return dt.isoformat()
+            except (ValueError, TypeError):
+                pass
+            # Retourner tel quel si c'est déjà au format ISO
+            if 'T' in raw_value or raw_value.count('-') >= 2:
+                return raw_value
+
+    # Fallback: date actuelle
+    return datetime.now(timezone.utc).isoformat()
+
+
+def published_timestamp(published: Optional[str]) -> Optional[int]:
+    """Timestamp epoch (secondes) d'une date de publication, None si elle n'est pas interprétable."""
+    if not published:
+        return None
+
+    try:
+        dt = datetime.fromisoformat(published)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(published)
+        except (ValueError, TypeError):
+            return None
+
+    # Date sans fuseau : considérée comme UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class _TextExtractor(HTMLParser):
+    """Texte d'un fragment HTML, sans le contenu des balises script et style."""
+
+    SKIPPED_TAGS = {'script', 'style'}
+    # Balises de bloc : séparent les mots de deux paragraphes consécutifs
+    BLOCK_TAGS = {
+        'br', 'p', 'div', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'pre', 'blockquote',
+        'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr'
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def summary_text(summary: Optional[str]) -> str:
+    """Texte intégral d'un résumé HTML : balises retirées, entités décodées, espaces normalisés."""
+    if not summary:
+        return ''
+
+    extractor = _TextExtractor()
+    extractor.feed(summary)
+    extractor.close()
+    return ' '.join(''.join(extractor.parts).split())
+
+
+def summary_preview(summary: Optional[str], max_length: int = PREVIEW_LENGTH) -> str:
+    """Aperçu texte d'un résumé HTML, voir summary_text et text_preview."""
+    return text_preview(summary_text(summary), max_length)
+
+
+def text_preview(text: str, max_length: int = PREVIEW_LENGTH) -> str:
+    """Texte tronqué sur une fin de mot au-delà de max_length caractères."""
+    if len(text) <= max_length:
+        return text
+
+    truncated = text[:max_length - 1]
+    # Coupe au dernier espace, sauf si le mot tronqué occupe plus de la moitié de l'aperçu
+    if ' ' in truncated[max_length // 2:]:
+        truncated = truncated.rsplit(' ', 1)[0]
+    return truncated.rstrip(' .,;:') + '…'
+
+
+def _parse_ttl(feed) -> Optional[int]:
+    """Élément RSS <ttl> (en minutes), converti en secondes."""
+    ttl = getattr(feed.feed, 'ttl', None)
+    try:
+        return int(ttl) * 60 if ttl else None
+    except (ValueError, TypeError):
+        return None
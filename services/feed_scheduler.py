@@ -0,0 +1,138 @@
+"""
+Planification adaptative des flux RSS.
+Chaque flux a sa propre échéance, rangée dans une file de priorité, et son
+propre intervalle qui s'adapte à la fréquence de changement observée.
+"""
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+# Au-delà, 2 ** errors dépasse de toute façon max_backoff
+MAX_BACKOFF_EXPONENT = 16
+
+
+class FeedScheduler:
+    """File de priorité (échéance, flux) avec intervalles adaptatifs par flux."""
+
+    def __init__(self, config: Dict):
+        self.logger = logging.getLogger('it_monitoring.feed_scheduler')
+        scheduler_config = config.get('scheduler', {})
+        self.default_interval = config.get('fetch_interval', 300)
+        self.min_interval = scheduler_config.get('min_interval', 120)
+        self.max_interval = scheduler_config.get('max_interval', 3600)
+        self.max_backoff = scheduler_config.get('max_backoff', 3600)
+        self.jitter = scheduler_config.get('jitter', 0.1)
+        # Facteurs appliqués à l'intervalle quand le flux a changé / n'a pas changé
+        self.speedup_factor = scheduler_config.get('speedup_factor', 0.5)
+        self.slowdown_factor = scheduler_config.get('slowdown_factor', 1.5)
+
+        self._queue: List = []
+        self._counter = itertools.count()
+        self._states: Dict[Hashable, Dict] = {}
+
+    def add(self, feed_ref: Hashable, delay: float = 0):
+        """Ajoute un flux à la file, dû dans `delay` secondes."""
+        if feed_ref not in self._states:
+            self._states[feed_ref] = {
+                'interval': min(max(self.default_interval, self.min_interval), self.max_interval),
+                'errors': 0,
+                'ttl': None,
+                'fetched': False,
+                'next_due': None
+            }
+        self._push(feed_ref, time.monotonic() + delay)
+
+    def add_all(self, feed_refs: Iterable[Hashable]):
+        for feed_ref in feed_refs:
+            self.add(feed_ref)
+
+    def _push(self, feed_ref: Hashable, due: float):
+        self._states[feed_ref]['next_due'] = due
+        heapq.heappush(self._queue, (due, next(self._counter), feed_ref))
+
+    def pop_due(self, now: Optional[float] = None) -> List[Hashable]:
+        """Retire et retourne tous les flux arrivés à échéance."""
+        now = time.monotonic() if now is None else now
+        due_refs = []
+
+        while self._queue and self._queue[0][0] <= now:
+            due, _, feed_ref = heapq.heappop(self._queue)
+            # Entrée périmée : le flux a été replanifié entre-temps (ex: force_fetch)
+            if self._states[feed_ref]['next_due'] != due:
+                continue
+            self._states[feed_ref]['next_due'] = None
+            due_refs.append(feed_ref)
+
+        return due_refs
+
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        """Délai avant la prochaine échéance, None si la file est vide."""
+        now = time.monotonic() if now is None else now
+
+        # Purge des entrées périmées en tête de file
+        while self._queue and self._states[self._queue[0][2]]['next_due'] != self._queue[0][0]:
+            heapq.heappop(self._queue)
+
+        if not self._queue:
+            return None
+        return max(self._queue[0][0] - now, 0)
+
+    def reschedule(self, feed_ref: Hashable, status: str, hints: Optional[Dict] = None) -> float:
+        """
+        Replanifie un flux après une récupération.
+
+        Args:
+            feed_ref: Identifiant du flux
+            status: 'updated', 'not_modified', 'unchanged', 'failed' ou 'skipped'
+            hints: max_age / retry_after / ttl (secondes) renvoyés par le serveur
+
+        Returns:
+            Le délai retenu avant la prochaine récupération (secondes)
+        """
+        if feed_ref not in self._states:
+            self.add(feed_ref)
+        state = self._states[feed_ref]
+        hints = hints or {}
+
+        if hints.get('ttl'):
+            state['ttl'] = hints['ttl']
+
+        if status == 'skipped':
+            # Disjoncteur ouvert : on revient à la fin du refroidissement, sans toucher à l'intervalle
+            delay = hints.get('retry_after') or state['interval']
+        elif status == 'failed':
+            # Backoff exponentiel, l'intervalle nominal est conservé pour la reprise ;
+            # l'exposant est borné pour qu'un flux en échec prolongé ne déborde pas en flottant
+            state['errors'] += 1
+            delay = min(state['interval'] * 2 ** min(state['errors'], MAX_BACKOFF_EXPONENT), self.max_backoff)
+        else:
+            state['errors'] = 0
+            # La première récupération ne dit rien de la fréquence de changement
+            if state['fetched'] and status == 'updated':
+                state['interval'] = max(state['interval'] * self.speedup_factor, self.min_interval)
+            elif state['fetched']:
+                state['interval'] = min(state['interval'] * self.slowdown_factor, self.max_interval)
+            delay = state['interval']
+
+            # Cache-Control max-age et <ttl> : inutile de revenir avant, dans la limite de max_interval
+            freshness = max(hints.get('max_age') or 0, state['ttl'] or 0)
+            delay = max(delay, min(freshness, self.max_interval))
+
+        if not state['fetched'] and status not in ('failed', 'skipped'):
+            # Première récupération : toutes les échéances partent du même instant,
+            # on les répartit uniformément pour éviter une rafale à chaque intervalle
+            state['fetched'] = True
+            delay = random.uniform(min(self.min_interval, delay), delay)
+        elif self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+
+        # Retry-After est une demande explicite du serveur : toujours respectée
+        if hints.get('retry_after'):
+            delay = max(delay, hints['retry_after'])
+
+        self.logger.debug(f"Next fetch of {feed_ref} in {delay:.0f}s ({status})")
+        self._push(feed_ref, time.monotonic() + delay)
+        return delay
@@ -0,0 +1,93 @@
+"""
+Sessions HTTP partagées.
+Chaque pool (flux RSS, Discord) a son propre connecteur aiohttp configuré
+depuis config.json, et compte ses connexions pour le monitoring.
+"""
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+
+class HttpPool:
+    """Session aiohttp avec connecteur réglé (keep-alive, cache DNS, limites) et statistiques."""
+
+    DEFAULTS = {
+        'limit': 50,
+        'limit_per_host': 4,
+        'keepalive_timeout': 60,
+        'dns_cache_ttl': 300,
+        'timeout': 30,
+        'connect_timeout': 10
+    }
+
+    def __init__(self, name: str, pool_config: Optional[Dict] = None):
+        self.name = name
+        self.logger = logging.getLogger(f'it_monitoring.http_pool.{name}')
+        self.pool_config = {**self.DEFAULTS, **(pool_config or {})}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {
+            'requests': 0,
+            'requests_in_flight': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Crée la session (à appeler dans la boucle asyncio de l'application)."""
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_config['limit'],
+            limit_per_host=self.pool_config['limit_per_host'],
+            keepalive_timeout=self.pool_config['keepalive_timeout'],
+            ttl_dns_cache=self.pool_config['dns_cache_ttl'],
+            use_dns_cache=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.pool_config['timeout'],
+            connect=self.pool_config['connect_timeout']
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[self._build_trace_config()]
+        )
+        self.logger.info(
+            f"HTTP pool '{self.name}' ready (limit={self.pool_config['limit']}, "
+            f"per_host={self.pool_config['limit_per_host']}, keepalive={self.pool_config['keepalive_timeout']}s)"
+        )
+        return self.session
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def counter(key: str, delta: int = 1):
+            async def callback(session, trace_config_ctx, params):
+                self.stats[key] += delta
+            return callback
+
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_request_start.append(counter('requests_in_flight'))
+        trace_config.on_request_end.append(counter('requests_in_flight', -1))
+        trace_config.on_request_exception.append(counter('requests_in_flight', -1))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    def get_stats(self) -> Dict:
+        """Statistiques du pool, avec le taux de réutilisation des connexions."""
+        connections = self.stats['connections_created'] + self.stats['connections_reused']
+        return {
+            **self.stats,
+            'reuse_ratio': round(self.stats['connections_reused'] / connections, 3) if connections else 0.0,
+            'limit': self.pool_config['limit'],
+            'limit_per_host': self.pool_config['limit_per_host']
+        }
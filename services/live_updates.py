@@ -0,0 +1,157 @@
+"""
+Diffusion en direct des nouvelles entrées aux navigateurs (WebSocket /api/feeds/live).
+Après chaque cycle de fetch, les nouvelles entrées et le statut sont lus une seule
+fois en base puis distribués aux clients selon leurs filtres : la charge ne dépend
+plus du nombre de tableaux de bord ouverts. Chaque client a une file d'envoi
+bornée ; un client trop lent est déconnecté plutôt que de retenir les autres.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import orjson
+
+
+class LiveClient:
+    """Connexion abonnée : filtres et file des messages à envoyer."""
+
+    def __init__(self, queue_size: int):
+        self.categories: Set[str] = set()
+        self.types: Set[str] = set()
+        # None dans la file : le client a été évincé, la connexion doit être fermée
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def set_filters(self, categories: List[str], types: List[str]):
+        self.categories = set(categories)
+        self.types = set(types)
+
+    def filter_key(self) -> Tuple[frozenset, frozenset]:
+        return frozenset(self.categories), frozenset(self.types)
+
+    def matches(self, entry: Dict) -> bool:
+        return (
+            (not self.categories or entry['category_key'] in self.categories)
+            and (not self.types or entry['feed_type'] in self.types)
+        )
+
+
+class LiveHub:
+    """Abonnements des clients WebSocket et publication des mises à jour après chaque cycle."""
+
+    DEFAULTS = {
+        'enabled': True,
+        'max_clients': 500,
+        'queue_size': 16,
+        'send_timeout': 10,
+        'heartbeat': 30,
+        'max_entries': 500
+    }
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logging.getLogger('it_monitoring.live_updates')
+        self.live_config = {**self.DEFAULTS, **config.get('live', {})}
+        self.enabled = self.live_config['enabled']
+        self.heartbeat = self.live_config['heartbeat']
+        self.send_timeout = self.live_config['send_timeout']
+        self.clients: Set[LiveClient] = set()
+        # Dernière entrée publiée (entries.id), comme le curseur de /api/feeds/changes
+        self.cursor = 0
+        self._last_status: Optional[Dict] = None
+        self.stats = {
+            'published': 0,
+            'messages_queued': 0,
+            'evictions': 0,
+            'rejected': 0
+        }
+
+    async def start(self):
+        """Les entrées déjà en base ne sont pas publiées : les clients les chargent par l'API."""
+        self.cursor = await self.config.get('database').get_last_entry_seq()
+
+    def subscribe(self) -> Optional[LiveClient]:
+        """Nouveau client, ou None si le direct est désactivé ou le nombre maximum de clients atteint."""
+        if not self.enabled or len(self.clients) >= self.live_config['max_clients']:
+            self.stats['rejected'] += 1
+            return None
+        client = LiveClient(self.live_config['queue_size'])
+        self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client: LiveClient):
+        self.clients.discard(client)
+
+    async def publish_updates(self):
+        """
+        Envoie aux clients les entrées insérées depuis la dernière publication et le statut s'il a
+        changé. Une requête par cycle quel que soit le nombre de clients, et un seul encodage
+        par combinaison de filtres.
+        """
+        db = self.config.get('database')
+        if not self.clients:
+            # Personne à prévenir : on avance le curseur sans lire les entrées
+            self.cursor = await db.get_last_entry_seq()
+            self._last_status = None
+            return
+
+        last_seq = await db.get_last_entry_seq()
+        entries = await db.get_new_entries_since(self.cursor, self.live_config['max_entries'])
+        # Trop d'entrées d'un coup : les clients complètent par /api/feeds/changes
+        has_more = len(entries) == self.live_config['max_entries']
+        cursor = entries[-1]['seq'] if entries else self.cursor
+        if not has_more:
+            cursor = max(cursor, last_seq)
+
+        status = await db.get_status()
+        status_summary = {
+            key: status[key] for key in ('total_categories', 'total_feeds', 'total_entries', 'last_update')
+        }
+        status_changed = status_summary != self._last_status
+
+        messages: Dict[Tuple[frozenset, frozenset], Optional[str]] = {}
+        for client in list(self.clients):
+            key = client.filter_key()
+            if key not in messages:
+                matching = [entry for entry in entries if client.matches(entry)]
+                if matching or status_changed or has_more:
+                    messages[key] = orjson.dumps({
+                        'type': 'update',
+                        'entries': matching,
+                        'cursor': cursor,
+                        'has_more': has_more,
+                        'status': status_summary if status_changed else None
+                    }).decode()
+                else:
+                    messages[key] = None
+            if messages[key] is not None:
+                self._enqueue(client, messages[key])
+
+        self.cursor = cursor
+        self._last_status = status_summary
+        self.stats['published'] += 1
+
+    def _enqueue(self, client: LiveClient, message: str):
+        try:
+            client.queue.put_nowait(message)
+            self.stats['messages_queued'] += 1
+        except asyncio.QueueFull:
+            self.evict(client)
+
+    def evict(self, client: LiveClient):
+        """Déconnecte un client qui ne suit pas : sa file est vidée et remplacée par l'ordre de fermeture."""
+        if client not in self.clients:
+            return
+        self.clients.discard(client)
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        client.queue.put_nowait(None)
+        self.stats['evictions'] += 1
+        self.logger.info("Slow live client evicted")
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'clients': len(self.clients),
+            'cursor': self.cursor,
+            **self.stats
+        }
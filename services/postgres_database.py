@@ -0,0 +1,1027 @@
+import asyncpg
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from services.feed_parser import published_timestamp, summary_text, text_preview
+from services.storage_backend import StorageBackend
+
+
+class PostgresDatabase(StorageBackend):
+    """
+    PostgreSQL storage, shared by several application replicas.
+    Same schema and behaviour as the SQLite backend; concurrency is handled by the server
+    (row locks, SKIP LOCKED, advisory locks) instead of an in-process write lock.
+    """
+
+    # Advisory lock keys: schema setup at startup, and fetch cycles (see save_feeds_data)
+    SCHEMA_LOCK = 0x49544D01
+    WRITE_LOCK = 0x49544D02
+
+    # Most recent matches ranked by a search
+    SEARCH_WINDOW = 2000
+
+    # A notification still 'sending' after this many seconds was left by a dead replica
+    STALE_CLAIM_AFTER = 300
+
+    ENTRY_COLUMNS = (
+        'feed_id', 'entry_id', 'title', 'link', 'summary_preview', 'author', 'published', 'published_ts'
+    )
+    # Stored in entry_bodies, next to the search document
+    BODY_COLUMNS = ('summary', 'summary_text')
+
+    # Indexed document, formatted with the {title}, {author} and {text} expressions. The summary is
+    # indexed as plain text, so markup never matches a search; angle brackets left in decoded
+    # text ("List<String>") would be parsed as a tag and dropped
+    SEARCH_DOCUMENT = '''
+        setweight(to_tsvector('simple', translate(coalesce({title}, ''), '<>', '  ')), 'A') ||
+        setweight(to_tsvector('simple', coalesce({author}, '')), 'B') ||
+        setweight(to_tsvector('simple', translate(coalesce({text}, ''), '<>', '  ')), 'D')
+    '''
+
+    POSTGRES_DEFAULTS = {
+        'dsn': '${POSTGRES_DSN}',
+        'min_size': 2,
+        'max_size': 10,
+        'command_timeout': 30
+    }
+
+    def __init__(self, postgres_config: Optional[Dict] = None):
+        self.logger = logging.getLogger('it_monitoring.database')
+        self.postgres_config = {**self.POSTGRES_DEFAULTS, **(postgres_config or {})}
+        self._pool: Optional[asyncpg.Pool] = None
+        self.search_enabled = False
+
+    async def connect(self):
+        """Open the connection pool and create the schema."""
+        dsn = self._resolve_env_vars(self.postgres_config['dsn'])
+        if not dsn or dsn.startswith('${'):
+            raise ValueError("PostgreSQL DSN not configured or env var not set")
+
+        self._pool = await asyncpg.create_pool(
+            dsn,
+            min_size=self.postgres_config['min_size'],
+            max_size=self.postgres_config['max_size'],
+            command_timeout=self.postgres_config['command_timeout']
+        )
+        await self._create_tables()
+        self.search_enabled = True
+        self.logger.info("Connected to PostgreSQL")
+
+    async def close(self):
+        """Close the connection pool."""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+    @staticmethod
+    def _resolve_env_vars(value: str) -> str:
+        """Resolve ${VAR} references from the environment."""
+        if not value:
+            return value
+        return re.sub(r'\$\{([^}]+)\}', lambda match: os.environ.get(match.group(1), match.group(0)), value)
+
+    async def _create_tables(self):
+        """
+        Create tables, indexes and triggers if they don't exist. Replicas starting together
+        are serialised by an advisory lock held for the duration of the transaction.
+        """
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute('SELECT pg_advisory_xact_lock($1)', self.SCHEMA_LOCK)
+                await connection.execute('''
+                    CREATE TABLE IF NOT EXISTS categories (
+                        id BIGSERIAL PRIMARY KEY,
+                        key TEXT UNIQUE NOT NULL,
+                        name TEXT NOT NULL,
+                        last_update TEXT
+                    );
+
+                    CREATE TABLE IF NOT EXISTS feeds (
+                        id BIGSERIAL PRIMARY KEY,
+                        category_id BIGINT NOT NULL REFERENCES categories(id),
+                        key TEXT NOT NULL,
+                        name TEXT NOT NULL,
+                        url TEXT NOT NULL,
+                        type TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        content_hash TEXT,
+                        consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                        last_error TEXT,
+                        last_error_at TEXT,
+                        last_success_at TEXT,
+                        UNIQUE(category_id, key)
+                    );
+
+                    CREATE TABLE IF NOT EXISTS entries (
+                        id BIGSERIAL PRIMARY KEY,
+                        feed_id BIGINT NOT NULL REFERENCES feeds(id),
+                        entry_id TEXT NOT NULL,
+                        title TEXT,
+                        link TEXT,
+                        summary_preview TEXT,
+                        author TEXT,
+                        published TEXT,
+                        published_ts BIGINT,
+                        created_at TIMESTAMPTZ DEFAULT now(),
+                        UNIQUE(feed_id, entry_id)
+                    );
+
+                    -- Full summaries and their search document, read one at a time: list
+                    -- queries scan entries without loading them
+                    CREATE TABLE IF NOT EXISTS entry_bodies (
+                        entry_id BIGINT PRIMARY KEY REFERENCES entries(id) ON DELETE CASCADE,
+                        summary TEXT,
+                        summary_text TEXT,
+                        search TSVECTOR
+                    );
+
+                    CREATE TABLE IF NOT EXISTS notification_outbox (
+                        id BIGSERIAL PRIMARY KEY,
+                        entry_id BIGINT NOT NULL UNIQUE REFERENCES entries(id),
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at DOUBLE PRECISION NOT NULL DEFAULT 0,
+                        claimed_at DOUBLE PRECISION,
+                        delivered_to TEXT NOT NULL DEFAULT '[]',
+                        last_error TEXT,
+                        created_at TIMESTAMPTZ DEFAULT now()
+                    );
+
+                    CREATE TABLE IF NOT EXISTS feed_stats (
+                        feed_id BIGINT PRIMARY KEY REFERENCES feeds(id),
+                        entries_count BIGINT NOT NULL DEFAULT 0
+                    );
+
+                    ALTER TABLE entries ADD COLUMN IF NOT EXISTS summary_preview TEXT;
+
+                    CREATE INDEX IF NOT EXISTS idx_entries_feed_id ON entries(feed_id);
+                    CREATE INDEX IF NOT EXISTS idx_entries_entry_id ON entries(entry_id);
+                    CREATE INDEX IF NOT EXISTS idx_entries_published_ts ON entries(published_ts DESC, id DESC);
+                    CREATE INDEX IF NOT EXISTS idx_entry_bodies_search ON entry_bodies USING GIN (search);
+                    CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox(status, next_attempt_at);
+                ''')
+                await self._create_stats_triggers(connection)
+                await self._move_summaries(connection)
+                await self._backfill_summary_text(connection)
+
+    async def _create_stats_triggers(self, connection: asyncpg.Connection):
+        """
+        Maintain feed_stats.entries_count from statement-level triggers on entries (one counter
+        update per feed and per statement, not per row). When the triggers are first installed,
+        the counters are rebuilt in the same transaction.
+        """
+        # Trigger names are only unique per table: look on the entries table of the current schema
+        exists = await connection.fetchval(
+            "SELECT 1 FROM pg_trigger WHERE tgname = 'trg_entries_stats_insert' AND tgrelid = 'entries'::regclass"
+        )
+        if exists:
+            return
+
+        await connection.execute('''
+            DELETE FROM feed_stats;
+            INSERT INTO feed_stats (feed_id, entries_count)
+            SELECT feed_id, COUNT(*) FROM entries GROUP BY feed_id;
+
+            CREATE OR REPLACE FUNCTION entries_stats_insert() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO feed_stats (feed_id, entries_count)
+                SELECT feed_id, COUNT(*) FROM new_entries GROUP BY feed_id
+                ON CONFLICT (feed_id) DO UPDATE SET entries_count = feed_stats.entries_count + EXCLUDED.entries_count;
+                RETURN NULL;
+            END $$;
+
+            CREATE OR REPLACE FUNCTION entries_stats_delete() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE feed_stats s SET entries_count = s.entries_count - d.count
+                FROM (SELECT feed_id, COUNT(*) as count FROM old_entries GROUP BY feed_id) d
+                WHERE s.feed_id = d.feed_id;
+                RETURN NULL;
+            END $$;
+
+            CREATE TRIGGER trg_entries_stats_insert AFTER INSERT ON entries
+            REFERENCING NEW TABLE AS new_entries
+            FOR EACH STATEMENT EXECUTE FUNCTION entries_stats_insert();
+
+            CREATE TRIGGER trg_entries_stats_delete AFTER DELETE ON entries
+            REFERENCING OLD TABLE AS old_entries
+            FOR EACH STATEMENT EXECUTE FUNCTION entries_stats_delete();
+        ''')
+
+    async def _move_summaries(self, connection: asyncpg.Connection):
+        """
+        Move the summaries of a database created before entry_bodies out of the entries table,
+        with the search column and its index. Their search document is rebuilt by the backfill.
+        """
+        columns = {row['column_name'] for row in await connection.fetch('''
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'entries'
+        ''')}
+        if 'summary' not in columns:
+            return
+
+        await connection.execute('''
+            INSERT INTO entry_bodies (entry_id, summary)
+            SELECT id, summary FROM entries
+            ON CONFLICT (entry_id) DO NOTHING;
+            ALTER TABLE entries
+                DROP COLUMN IF EXISTS search,
+                DROP COLUMN summary,
+                DROP COLUMN IF EXISTS summary_text;
+        ''')
+        self.logger.info("Moved entry summaries to entry_bodies")
+
+    async def _backfill_summary_text(self, connection: asyncpg.Connection):
+        """
+        Compute summary_text, the search document and summary_preview for entries stored before
+        the columns existed, by batches of ids.
+        """
+        search = self.SEARCH_DOCUMENT.format(title='e.title', author='e.author', text='$1')
+        last_id, updated = 0, 0
+        while True:
+            rows = await connection.fetch('''
+                SELECT e.id, b.summary FROM entries e
+                JOIN entry_bodies b ON b.entry_id = e.id
+                WHERE (b.search IS NULL OR e.summary_preview IS NULL) AND e.id > $1
+                ORDER BY e.id
+                LIMIT 1000
+            ''', last_id)
+            if not rows:
+                break
+
+            texts = [(summary_text(row['summary']), row['id']) for row in rows]
+            await connection.executemany(f'''
+                UPDATE entry_bodies b SET summary_text = $1, search = {search}
+                FROM entries e
+                WHERE b.entry_id = $2 AND e.id = b.entry_id
+            ''', texts)
+            await connection.executemany(
+                'UPDATE entries SET summary_preview = $1 WHERE id = $2',
+                [(text_preview(text), entry_id) for text, entry_id in texts]
+            )
+            last_id = rows[-1]['id']
+            updated += len(rows)
+
+        if updated:
+            self.logger.info(f"Backfilled summary_text of {updated} entries")
+
+    async def save_feeds_data(self, feeds_data: Dict, notify: bool = False) -> List[Tuple[int, str]]:
+        """
+        Save feeds data to database in a single transaction. Returns the (feed_id, entry_id) pairs newly inserted.
+        With notify, new entries of feeds that already had entries are queued for Discord
+        (the first fetch of a feed only fills its history).
+
+        Fetch cycles of all replicas are serialised by an advisory lock: entry ids are then
+        committed in increasing order, which /api/feeds/changes relies on to never skip an entry.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute('SELECT pg_advisory_xact_lock($1)', self.WRITE_LOCK)
+
+                # Categories and feeds: bulk UPDATE, then INSERT only the missing rows
+                # (an upsert would consume a sequence value on every cycle)
+                await connection.executemany(
+                    'UPDATE categories SET name = $1, last_update = $2 WHERE key = $3',
+                    [(category_data['category'], timestamp, category_key) for category_key, category_data in feeds_data.items()]
+                )
+                category_ids = await self._get_category_ids(connection, list(feeds_data))
+                missing_categories = [
+                    (category_key, category_data['category'], timestamp)
+                    for category_key, category_data in feeds_data.items()
+                    if category_key not in category_ids
+                ]
+                if missing_categories:
+                    await connection.executemany(
+                        'INSERT INTO categories (key, name, last_update) VALUES ($1, $2, $3) ON CONFLICT (key) DO NOTHING',
+                        missing_categories
+                    )
+                    category_ids = await self._get_category_ids(connection, list(feeds_data))
+
+                feed_rows = []
+                for category_key, category_data in feeds_data.items():
+                    for feed_key, feed_data in category_data.get('feeds', {}).items():
+                        feed_info = feed_data['feed_info']
+                        feed_rows.append((
+                            feed_info['name'], feed_info['url'], feed_info['type'],
+                            feed_info.get('etag'), feed_info.get('last_modified'), feed_info.get('content_hash'),
+                            category_ids[category_key], feed_key
+                        ))
+                await connection.executemany('''
+                    UPDATE feeds SET name = $1, url = $2, type = $3, etag = $4, last_modified = $5, content_hash = $6
+                    WHERE category_id = $7 AND key = $8
+                ''', feed_rows)
+                feed_ids = await self._get_feed_ids(connection, list(category_ids.values()))
+                # Same values, reordered as (category_id, key, name, ...) for the INSERT
+                missing_feeds = [row[-2:] + row[:-2] for row in feed_rows if row[-2:] not in feed_ids]
+                if missing_feeds:
+                    await connection.executemany('''
+                        INSERT INTO feeds (category_id, key, name, url, type, etag, last_modified, content_hash)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                        ON CONFLICT (category_id, key) DO NOTHING
+                    ''', missing_feeds)
+                    feed_ids = await self._get_feed_ids(connection, list(category_ids.values()))
+
+                entries = []
+                for category_key, category_data in feeds_data.items():
+                    for feed_key, feed_data in category_data.get('feeds', {}).items():
+                        feed_id = feed_ids[(category_ids[category_key], feed_key)]
+                        entries.extend((feed_id, entry) for entry in feed_data.get('entries', []))
+
+                # Feeds fetched for the first time only fill their history, checked before inserting
+                notify_feeds = await self._feeds_with_entries(connection, {feed_id for feed_id, _ in entries}) if notify else set()
+                inserted = await self._insert_entries(connection, entries)
+
+                outbox_ids = [row_id for row_id, feed_id, _ in inserted if feed_id in notify_feeds]
+                if outbox_ids:
+                    await connection.execute('''
+                        INSERT INTO notification_outbox (entry_id)
+                        SELECT unnest($1::bigint[])
+                        ON CONFLICT (entry_id) DO NOTHING
+                    ''', outbox_ids)
+
+        # last_update always changes; entry listings only when rows were added
+        self._bump_generation(entries=bool(inserted or missing_categories or missing_feeds))
+        new_entries = [(feed_id, entry_id) for _, feed_id, entry_id in inserted]
+        self.logger.info(f"Saved {len(new_entries)} new entries to database")
+        return new_entries
+
+    async def _get_category_ids(self, connection: asyncpg.Connection, keys: List[str]) -> Dict[str, int]:
+        """Map category keys to their id."""
+        rows = await connection.fetch('SELECT id, key FROM categories WHERE key = ANY($1::text[])', keys)
+        return {row['key']: row['id'] for row in rows}
+
+    async def _get_feed_ids(self, connection: asyncpg.Connection, category_ids: List[int]) -> Dict[Tuple[int, str], int]:
+        """Map (category_id, feed key) to feed id for the given categories."""
+        rows = await connection.fetch(
+            'SELECT id, category_id, key FROM feeds WHERE category_id = ANY($1::bigint[])', category_ids
+        )
+        return {(row['category_id'], row['key']): row['id'] for row in rows}
+
+    async def _feeds_with_entries(self, connection: asyncpg.Connection, feed_ids: set) -> set:
+        """Subset of feed_ids that already have at least one stored entry."""
+        if not feed_ids:
+            return set()
+        rows = await connection.fetch('''
+            SELECT f.id FROM feeds f
+            WHERE f.id = ANY($1::bigint[])
+            AND EXISTS (SELECT 1 FROM entries e WHERE e.feed_id = f.id)
+        ''', list(feed_ids))
+        return {row['id'] for row in rows}
+
+    async def _insert_entries(self, connection: asyncpg.Connection, entries: List[Tuple[int, Dict]]) -> List[Tuple[int, int, str]]:
+        """
+        Insert (feed_id, entry) pairs, ignoring entries already stored. The batch is streamed
+        with COPY into a temporary table, then inserted in one statement with the bodies of the
+        rows actually inserted. Returns their (entries.id, feed_id, entry_id).
+        """
+        if not entries:
+            return []
+
+        records = []
+        for feed_id, entry in entries:
+            published_ts = entry.get('published_ts') or published_timestamp(entry.get('published'))
+            text = entry.get('summary_text')
+            if text is None:
+                text = summary_text(entry.get('summary'))
+            records.append((
+                feed_id,
+                entry.get('id', ''),
+                entry.get('title', ''),
+                entry.get('link', ''),
+                entry.get('summary_preview') or text_preview(text),
+                entry.get('author', ''),
+                entry.get('published', ''),
+                published_ts if published_ts is not None else int(time.time()),
+                entry.get('summary', ''),
+                text
+            ))
+
+        await connection.execute('''
+            CREATE TEMP TABLE entries_staging (
+                feed_id BIGINT, entry_id TEXT, title TEXT, link TEXT, summary_preview TEXT,
+                author TEXT, published TEXT, published_ts BIGINT, summary TEXT, summary_text TEXT
+            ) ON COMMIT DROP
+        ''')
+        await connection.copy_records_to_table(
+            'entries_staging', records=records, columns=self.ENTRY_COLUMNS + self.BODY_COLUMNS
+        )
+
+        columns = ', '.join(self.ENTRY_COLUMNS)
+        search = self.SEARCH_DOCUMENT.format(title='s.title', author='s.author', text='s.summary_text')
+        # A batch listing the same entry twice keeps one row, for both tables
+        rows = await connection.fetch(f'''
+            WITH staged AS (
+                SELECT DISTINCT ON (feed_id, entry_id) * FROM entries_staging
+            ),
+            inserted AS (
+                INSERT INTO entries ({columns})
+                SELECT {columns} FROM staged
+                ON CONFLICT (feed_id, entry_id) DO NOTHING
+                RETURNING id, feed_id, entry_id
+            ),
+            bodies AS (
+                INSERT INTO entry_bodies (entry_id, summary, summary_text, search)
+                SELECT i.id, s.summary, s.summary_text, {search}
+                FROM inserted i
+                JOIN staged s ON s.feed_id = i.feed_id AND s.entry_id = i.entry_id
+            )
+            SELECT id, feed_id, entry_id FROM inserted
+        ''')
+        return [(row['id'], row['feed_id'], row['entry_id']) for row in rows]
+
+    async def claim_notifications(self, limit: int) -> List[Dict]:
+        """
+        Claim a batch of due notifications from the outbox, with their entry data.
+        Claimed rows move to 'sending' and their attempt counter is incremented; SKIP LOCKED
+        lets the workers of several replicas claim disjoint batches.
+        """
+        now = time.time()
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch('''
+                WITH claimed AS (
+                    UPDATE notification_outbox
+                    SET status = 'sending', attempts = attempts + 1, claimed_at = $1
+                    WHERE id IN (
+                        SELECT id FROM notification_outbox
+                        WHERE status = 'pending' AND next_attempt_at <= $1
+                        ORDER BY id
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, attempts, delivered_to, entry_id
+                )
+                SELECT
+                    o.id as outbox_id,
+                    o.attempts,
+                    o.delivered_to,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    b.summary,
+                    e.author,
+                    e.published,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM claimed o
+                JOIN entries e ON o.entry_id = e.id
+                LEFT JOIN entry_bodies b ON b.entry_id = e.id
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                ORDER BY o.id
+            ''', now, limit)
+
+        claimed = [dict(row) for row in rows]
+        for row in claimed:
+            row['delivered_to'] = json.loads(row['delivered_to'])
+        return claimed
+
+    async def mark_notification_delivered(self, outbox_id: int, delivered_to: List[str]):
+        """Record the webhooks already delivered, so a retry never sends to them twice."""
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                'UPDATE notification_outbox SET delivered_to = $1 WHERE id = $2', json.dumps(delivered_to), outbox_id
+            )
+
+    async def complete_notification(self, outbox_id: int):
+        """Remove a fully delivered notification from the outbox."""
+        async with self._pool.acquire() as connection:
+            await connection.execute('DELETE FROM notification_outbox WHERE id = $1', outbox_id)
+
+    async def retry_notification(self, outbox_id: int, delay: float, error: str, give_up: bool = False):
+        """Schedule another attempt after delay seconds, or mark the notification as failed."""
+        async with self._pool.acquire() as connection:
+            await connection.execute(
+                'UPDATE notification_outbox SET status = $1, next_attempt_at = $2, last_error = $3 WHERE id = $4',
+                'failed' if give_up else 'pending', time.time() + delay, error, outbox_id
+            )
+
+    async def requeue_stale_notifications(self) -> int:
+        """
+        Put back notifications left in 'sending' by a crash or restart. Returns their count.
+        Only claims older than STALE_CLAIM_AFTER are requeued: younger ones may belong to
+        another replica still sending them. The outbox worker calls it periodically, so claims
+        of a replica that died are picked up once they expire, not only at the next startup.
+        """
+        async with self._pool.acquire() as connection:
+            status = await connection.execute(
+                "UPDATE notification_outbox SET status = 'pending' WHERE status = 'sending' AND claimed_at < $1",
+                time.time() - self.STALE_CLAIM_AFTER
+            )
+        return self._rowcount(status)
+
+    async def get_outbox_state(self) -> Dict:
+        """Number of notifications waiting in the outbox and epoch time of the next due one."""
+        async with self._pool.acquire() as connection:
+            row = await connection.fetchrow('''
+                SELECT COUNT(*) as pending, MIN(next_attempt_at) as next_attempt_at
+                FROM notification_outbox
+                WHERE status = 'pending'
+            ''')
+        return {'pending': row['pending'], 'next_attempt_at': row['next_attempt_at']}
+
+    async def get_expired_entry_ids(self, feed_type: str, cutoff_ts: Optional[int] = None,
+                                    max_rows: Optional[int] = None, keep_latest: int = 0) -> List[int]:
+        """
+        Ids of the entries of a feed type that fall outside a retention policy: published before
+        cutoff_ts, or beyond the max_rows most recent of their feed. The keep_latest most recent
+        entries of each feed are always kept, since the feed still lists them and deleting them
+        would insert (and notify) them again on the next fetch.
+        """
+        conditions = []
+        params: List = [feed_type, keep_latest]
+        if cutoff_ts is not None:
+            params.append(cutoff_ts)
+            conditions.append(f'published_ts < ${len(params)}')
+        if max_rows is not None:
+            params.append(max_rows)
+            conditions.append(f'row_rank > ${len(params)}')
+        if not conditions:
+            return []
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(f'''
+                SELECT id FROM (
+                    SELECT
+                        e.id,
+                        e.published_ts,
+                        ROW_NUMBER() OVER (PARTITION BY e.feed_id ORDER BY e.published_ts DESC, e.id DESC) as row_rank
+                    FROM entries e
+                    JOIN feeds f ON e.feed_id = f.id
+                    WHERE f.type = $1
+                ) ranked
+                WHERE row_rank > $2 AND ({' OR '.join(conditions)})
+                ORDER BY id
+            ''', *params)
+        return [row['id'] for row in rows]
+
+    async def delete_entries(self, entry_ids: List[int]) -> int:
+        """
+        Delete entries by id, with their abandoned notifications. Entries still waiting in the
+        outbox are kept. Returns the number of entries deleted.
+        """
+        if not entry_ids:
+            return 0
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(
+                    "DELETE FROM notification_outbox WHERE status = 'failed' AND entry_id = ANY($1::bigint[])",
+                    entry_ids
+                )
+                status = await connection.execute('''
+                    DELETE FROM entries e
+                    WHERE e.id = ANY($1::bigint[])
+                    AND NOT EXISTS (SELECT 1 FROM notification_outbox o WHERE o.entry_id = e.id)
+                ''', entry_ids)
+        deleted = self._rowcount(status)
+        if deleted:
+            self._bump_generation()
+        return deleted
+
+    async def purge_failed_notifications(self, older_than_days: float) -> int:
+        """Delete abandoned notifications older than the given age. Returns their count."""
+        async with self._pool.acquire() as connection:
+            status = await connection.execute(
+                "DELETE FROM notification_outbox WHERE status = 'failed' AND created_at < now() - $1::float8 * interval '1 day'",
+                float(older_than_days)
+            )
+        return self._rowcount(status)
+
+    async def incremental_vacuum(self, max_pages: int = 0) -> int:
+        """Space freed by deletions is reused after autovacuum; nothing to give back explicitly. Always 0."""
+        return 0
+
+    async def get_storage_stats(self) -> Dict:
+        """Size of the database, in bytes. Dead tuples are tracked by autovacuum, free_bytes is always 0."""
+        async with self._pool.acquire() as connection:
+            size = await connection.fetchval('SELECT pg_database_size(current_database())')
+        return {'size_bytes': size, 'free_bytes': 0}
+
+    @staticmethod
+    def _rowcount(status: str) -> int:
+        """Number of rows affected, from a command status such as 'DELETE 12'."""
+        return int(status.split()[-1])
+
+    async def get_feed_validators(self) -> Dict[str, Dict]:
+        """Get the cache validators (ETag, Last-Modified, body digest) stored for each feed URL."""
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch('SELECT url, etag, last_modified, content_hash FROM feeds')
+
+        return {
+            row['url']: {
+                'etag': row['etag'],
+                'last_modified': row['last_modified'],
+                'content_hash': row['content_hash']
+            }
+            for row in rows
+        }
+
+    async def get_feed_health(self) -> Dict[str, Dict]:
+        """Get the persisted failure tracking of each feed URL."""
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch('''
+                SELECT url, consecutive_failures, last_error, last_error_at, last_success_at
+                FROM feeds
+            ''')
+
+        return {
+            row['url']: {
+                'consecutive_failures': row['consecutive_failures'],
+                'last_error': row['last_error'],
+                'last_error_at': row['last_error_at'],
+                'last_success_at': row['last_success_at']
+            }
+            for row in rows
+        }
+
+    async def update_feed_health(self, feed_health: Dict[str, Dict]):
+        """
+        Persist failure counts, last error and last success per feed URL. A feed that has
+        never been saved (e.g. failing since it was configured) has no row yet: it is created
+        from the category, key, name and type carried by its health entry.
+        """
+        if not feed_health:
+            return
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.executemany('''
+                    UPDATE feeds
+                    SET consecutive_failures = $1, last_error = $2, last_error_at = $3, last_success_at = $4
+                    WHERE url = $5
+                ''', [
+                    (
+                        health['consecutive_failures'], health['last_error'],
+                        health['last_error_at'], health['last_success_at'], url
+                    )
+                    for url, health in feed_health.items()
+                ])
+
+                rows = await connection.fetch('SELECT url FROM feeds WHERE url = ANY($1::text[])', list(feed_health))
+                saved_urls = {row['url'] for row in rows}
+                missing = [(url, health) for url, health in feed_health.items() if url not in saved_urls]
+
+                if missing:
+                    await connection.executemany(
+                        'INSERT INTO categories (key, name) VALUES ($1, $2) ON CONFLICT (key) DO NOTHING',
+                        list({health['category_key']: health['category'] for _, health in missing}.items())
+                    )
+                    category_ids = await self._get_category_ids(
+                        connection, list({health['category_key'] for _, health in missing})
+                    )
+                    # The key may already exist under a previous URL of the feed
+                    await connection.executemany('''
+                        INSERT INTO feeds (
+                            category_id, key, name, url, type,
+                            consecutive_failures, last_error, last_error_at, last_success_at
+                        )
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                        ON CONFLICT (category_id, key) DO UPDATE SET
+                            url = EXCLUDED.url,
+                            consecutive_failures = EXCLUDED.consecutive_failures,
+                            last_error = EXCLUDED.last_error,
+                            last_error_at = EXCLUDED.last_error_at,
+                            last_success_at = EXCLUDED.last_success_at
+                    ''', [
+                        (
+                            category_ids[health['category_key']], health['feed_key'], health['name'], url, health['type'],
+                            health['consecutive_failures'], health['last_error'],
+                            health['last_error_at'], health['last_success_at']
+                        )
+                        for url, health in missing
+                    ])
+
+        # New feed rows show up in category and type listings
+        self._bump_generation(entries=bool(missing))
+
+    async def get_latest_entries(self, limit: int = 500) -> List[Dict]:
+        """Get latest entries sorted by published date."""
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch('''
+                SELECT
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                ORDER BY e.published_ts DESC, e.id DESC
+                LIMIT $1
+            ''', limit)
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _filter_conditions(params: List, categories: Optional[List[str]], types: Optional[List[str]]) -> List[str]:
+        """Category and type filters, appending their values to params."""
+        conditions = []
+        if categories:
+            params.append(categories)
+            conditions.append(f'c.key = ANY(${len(params)}::text[])')
+        if types:
+            params.append(types)
+            conditions.append(f'f.type = ANY(${len(params)}::text[])')
+        return conditions
+
+    async def get_entries_page(self, limit: int = 100, categories: Optional[List[str]] = None,
+                               types: Optional[List[str]] = None, before: Optional[Tuple[int, int]] = None,
+                               since: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """
+        Keyset pagination over entries, newest first, on the (published_ts, id) index.
+
+        Args:
+            limit: Maximum number of entries
+            categories: Category keys to keep (all if empty)
+            types: Feed types to keep (all if empty)
+            before: (published_ts, seq) cursor, only entries older than it
+            since: (published_ts, seq) cursor, only entries newer than it; the page then holds
+                the oldest of them, so a client catching up never skips entries
+        """
+        params: List = []
+        conditions = self._filter_conditions(params, categories, types)
+        if before:
+            params.extend(before)
+            conditions.append(f'(e.published_ts, e.id) < (${len(params) - 1}, ${len(params)})')
+        if since:
+            params.extend(since)
+            conditions.append(f'(e.published_ts, e.id) > (${len(params) - 1}, ${len(params)})')
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        order = 'ASC' if since else 'DESC'
+        params.append(limit)
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(f'''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                {where}
+                ORDER BY e.published_ts {order}, e.id {order}
+                LIMIT ${len(params)}
+            ''', *params)
+
+        entries = [dict(row) for row in rows]
+        if since:
+            entries.reverse()
+        return entries
+
+    async def search_entries(self, query: str, limit: int = 20, offset: int = 0,
+                             categories: Optional[List[str]] = None, types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Full-text search on the GIN-indexed tsvector of entry_bodies, best matches first (ts_rank_cd, title
+        weighted over author and summary text). Ranking is done over the SEARCH_WINDOW most recent
+        matches, and headlines are only computed for the returned page. title_snippet and
+        snippet carry SNIPPET_START / SNIPPET_END around the matched terms.
+        """
+        words, prefix = self._ts_query(query)
+        if not words and not prefix:
+            return []
+
+        # Parsed by the server, with the same parser as the indexed text ("6.8" stays one lexeme)
+        params: List = []
+        query_parts = []
+        if words:
+            params.append(words)
+            query_parts.append(f"websearch_to_tsquery('simple', ${len(params)})")
+        if prefix:
+            params.append(prefix)
+            query_parts.append(f"to_tsquery('simple', quote_literal(${len(params)}::text) || ':*')")
+
+        conditions = ['b.search @@ q.query'] + self._filter_conditions(params, categories, types)
+        params.extend((self.SEARCH_WINDOW, limit, offset))
+        window, page_limit, page_offset = (f'${index}' for index in range(len(params) - 2, len(params) + 1))
+
+        markers = f'StartSel="{self.SNIPPET_START}", StopSel="{self.SNIPPET_END}"'
+        params.append(f'{markers}, HighlightAll=true')
+        title_options = f'${len(params)}'
+        params.append(f'{markers}, MaxWords=24, MinWords=12, ShortWord=2, MaxFragments=2, FragmentDelimiter=" … "')
+        summary_options = f'${len(params)}'
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(f'''
+                WITH q AS (SELECT {' && '.join(query_parts)} as query),
+                recent AS (
+                    SELECT e.id, ts_rank_cd(b.search, q.query) as score
+                    FROM entry_bodies b
+                    JOIN entries e ON e.id = b.entry_id
+                    JOIN feeds f ON e.feed_id = f.id
+                    JOIN categories c ON f.category_id = c.id
+                    CROSS JOIN q
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY e.id DESC
+                    LIMIT {window}
+                ),
+                page AS (
+                    SELECT id, score FROM recent
+                    ORDER BY score DESC, id DESC
+                    LIMIT {page_limit} OFFSET {page_offset}
+                )
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type,
+                    ts_headline('simple', translate(coalesce(e.title, ''), '<>', '  '),
+                                q.query, {title_options}) as title_snippet,
+                    ts_headline('simple', translate(coalesce(b.summary_text, ''), '<>', '  '),
+                                q.query, {summary_options}) as snippet
+                FROM page p
+                JOIN entries e ON e.id = p.id
+                JOIN entry_bodies b ON b.entry_id = p.id
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                CROSS JOIN q
+                ORDER BY p.score DESC, p.id DESC
+            ''', *params)
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _ts_query(query: str) -> Tuple[str, str]:
+        """
+        Split user input into (words, prefix). words goes through websearch_to_tsquery (words
+        ANDed, "quoted phrases", -exclusion, never a syntax error); prefix is the last word when it
+        is a plain token of at least 2 characters, matched as a prefix so results follow typing.
+        """
+        if not re.search(r'\w', query):
+            return '', ''
+        words = query.split()
+        head = ' '.join(words[:-1])
+        last = words[-1]
+        if (
+            re.fullmatch(r'[\w.\-]+', last) and not last.startswith('-') and len(re.findall(r'\w', last)) >= 2
+            # No prefix inside a "quoted phrase" or around an "or"
+            and head.count('"') % 2 == 0 and 'or' not in (last.lower(), words[-2].lower() if head else '')
+        ):
+            return head, last
+        return query, ''
+
+    async def get_categories(self) -> Dict:
+        """Get all categories with their info (entry counts come from feed_stats)."""
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch('''
+                SELECT
+                    c.key,
+                    c.name,
+                    c.last_update,
+                    COUNT(f.id) as feeds_count,
+                    COALESCE(SUM(s.entries_count), 0) as entries_count
+                FROM categories c
+                LEFT JOIN feeds f ON c.id = f.category_id
+                LEFT JOIN feed_stats s ON s.feed_id = f.id
+                GROUP BY c.id
+            ''')
+
+        return {
+            row['key']: {
+                'name': row['name'],
+                'last_update': row['last_update'],
+                'feeds_count': row['feeds_count'],
+                'entries_count': int(row['entries_count'])
+            }
+            for row in rows
+        }
+
+    async def get_status(self) -> Dict:
+        """
+        Get database status/stats. Reads one row per category and per feed, with entry counts
+        from feed_stats: the cost does not depend on the number of stored entries.
+        """
+        async with self._pool.acquire() as connection:
+            row = await connection.fetchrow(
+                'SELECT COUNT(*) as count, MAX(last_update) as last_update FROM categories'
+            )
+            categories_count, last_update = row['count'], row['last_update']
+
+            rows = await connection.fetch('''
+                SELECT
+                    c.key as category_key,
+                    f.key as feed_key,
+                    f.name,
+                    f.type,
+                    COALESCE(s.entries_count, 0) as entries_count,
+                    f.consecutive_failures,
+                    f.last_error,
+                    f.last_error_at,
+                    f.last_success_at
+                FROM feeds f
+                JOIN categories c ON f.category_id = c.id
+                LEFT JOIN feed_stats s ON s.feed_id = f.id
+                ORDER BY f.consecutive_failures DESC, c.key, f.key
+            ''')
+            feeds = [dict(row) for row in rows]
+
+        entries_by_category: Dict[str, int] = {}
+        entries_by_type: Dict[str, int] = {}
+        for feed in feeds:
+            entries_by_category[feed['category_key']] = entries_by_category.get(feed['category_key'], 0) + feed['entries_count']
+            entries_by_type[feed['type']] = entries_by_type.get(feed['type'], 0) + feed['entries_count']
+
+        return {
+            'total_categories': categories_count,
+            'total_feeds': len(feeds),
+            'total_entries': sum(entries_by_type.values()),
+            'entries_by_category': entries_by_category,
+            'entries_by_type': entries_by_type,
+            'last_update': last_update,
+            'feeds': feeds
+        }
+
+    async def get_new_entries_since(self, since_seq: int, limit: int = 500, categories: Optional[List[str]] = None,
+                                    types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get entries inserted after a sequence number (entries.id), in insertion order.
+        Ids are committed in increasing order, see save_feeds_data.
+        """
+        params: List = [since_seq]
+        conditions = ['e.id > $1'] + self._filter_conditions(params, categories, types)
+        params.append(limit)
+
+        async with self._pool.acquire() as connection:
+            rows = await connection.fetch(f'''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY e.id ASC
+                LIMIT ${len(params)}
+            ''', *params)
+        return [dict(row) for row in rows]
+
+    async def get_last_entry_seq(self) -> int:
+        """Sequence number of the last inserted entry (0 if none)."""
+        async with self._pool.acquire() as connection:
+            return await connection.fetchval('SELECT MAX(id) FROM entries') or 0
+
+    async def get_entry(self, seq: int) -> Optional[Dict]:
+        """Get one entry with its full summary (list queries only return summary_preview)."""
+        async with self._pool.acquire() as connection:
+            row = await connection.fetchrow('''
+                SELECT
+                    e.id as seq,
+                    e.entry_id as id,
+                    e.title,
+                    e.link,
+                    b.summary,
+                    e.summary_preview,
+                    e.author,
+                    e.published,
+                    e.published_ts,
+                    c.name as category,
+                    c.key as category_key,
+                    f.name as feed_name,
+                    f.type as feed_type
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON f.category_id = c.id
+                LEFT JOIN entry_bodies b ON b.entry_id = e.id
+                WHERE e.id = $1
+            ''', seq)
+        return dict(row) if row else None
@@ -0,0 +1,99 @@
+"""
+Rétention et compactage de la table entries.
+Les politiques sont définies par type de flux (âge maximum, nombre maximum
+d'entrées par flux) ; une tâche de fond supprime les entrées expirées par
+petits lots, puis rend les pages libérées au système de fichiers.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+class RetentionManager:
+    """Applique périodiquement les politiques de rétention de config.json."""
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logging.getLogger('it_monitoring.retention')
+        retention_config = config.get('retention', {})
+        self.enabled = retention_config.get('enabled', False)
+        self.interval = retention_config.get('interval', 3600)
+        self.batch_size = retention_config.get('batch_size', 500)
+        # Pause entre deux lots : laisse passer les écritures des cycles de fetch et de l'outbox
+        self.batch_pause = retention_config.get('batch_pause', 0.1)
+        self.vacuum_pages = retention_config.get('vacuum_pages', 0)
+        self.failed_notification_days = retention_config.get('failed_notification_days', 30)
+        self.policies: Dict[str, Dict] = retention_config.get('policies', {})
+        # Les entrées encore listées par le flux ne sont jamais supprimées (sinon réinsérées et renotifiées)
+        self.keep_latest = config.get('fetcher', {}).get('max_entries', 20)
+        self._worker: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict] = None
+
+    def start(self):
+        if self._worker or not self.enabled:
+            return
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._worker:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error in retention task: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict:
+        """Applique toutes les politiques puis compacte la base. Retourne le bilan de l'exécution."""
+        db = self.config.get('database')
+        start = time.perf_counter()
+        deleted = {}
+
+        for feed_type, policy in self.policies.items():
+            max_age_days = policy.get('max_age_days')
+            cutoff_ts = int(time.time() - max_age_days * 86400) if max_age_days else None
+            expired_ids = await db.get_expired_entry_ids(
+                feed_type, cutoff_ts, policy.get('max_rows'), self.keep_latest
+            )
+
+            deleted[feed_type] = 0
+            for index in range(0, len(expired_ids), self.batch_size):
+                deleted[feed_type] += await db.delete_entries(expired_ids[index:index + self.batch_size])
+                await asyncio.sleep(self.batch_pause)
+
+        purged_notifications = await db.purge_failed_notifications(self.failed_notification_days)
+        bytes_reclaimed = await db.incremental_vacuum(self.vacuum_pages)
+
+        self.last_run = {
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'duration': round(time.perf_counter() - start, 3),
+            'deleted': deleted,
+            'purged_notifications': purged_notifications,
+            'bytes_reclaimed': bytes_reclaimed,
+            **await db.get_storage_stats()
+        }
+        self.logger.info(
+            f"Retention: {sum(deleted.values())} entries deleted, "
+            f"{bytes_reclaimed / 1024:.0f} KiB reclaimed in {self.last_run['duration']:.2f}s"
+        )
+        return self.last_run
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'policies': self.policies,
+            'last_run': self.last_run
+        }
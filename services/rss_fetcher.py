@@ -1,10 +1,25 @@
+import asyncio
+import hashlib
 import logging
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import aiohttp
-import feedparser
-from quart import current_app
+
+from services.circuit_breaker import CircuitBreaker
+from services.feed_parser import parse_feed
+
+
+# Fin d'une entrée RSS (<item>) ou Atom (<entry>), pour couper la lecture au plus tôt
+ENTRY_END_PATTERN = re.compile(rb'</(item|entry)\s*>')
+MAX_ENTRY_END_LENGTH = len(b'</entry>')
 
 
 class RSSFetcher:
@@ -13,103 +28,396 @@ class RSSFetcher:
         self.logger = logging.getLogger('it_monitoring.rss_fetcher')
         self.session: Optional[aiohttp.ClientSession] = None
 
+        fetcher_config = config.get('fetcher', {})
+        self.max_entries = fetcher_config.get('max_entries', 20)
+        self.max_body_bytes = fetcher_config.get('max_body_bytes', 5 * 1024 * 1024)
+        self.per_host_limit = fetcher_config.get('per_host_limit', 4)
+        self._semaphore = asyncio.Semaphore(max(fetcher_config.get('max_concurrency', 10), 1))
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Validateurs par URL : ETag / Last-Modified pour les GET conditionnels,
+        # et empreinte du corps pour les serveurs qui n'en envoient pas
+        self._validators: Dict[str, Dict] = {}
+        self.last_cycle_stats: Dict[str, int] = {}
+        self.total_stats: Dict[str, int] = {}
+
+        breaker_config = config.get('circuit_breaker', {})
+        self.failure_threshold = breaker_config.get('failure_threshold', 3)
+        self.host_failure_threshold = breaker_config.get('host_failure_threshold', 5)
+        self.breaker_cooldown = breaker_config.get('cooldown', 600)
+        self._feed_breakers: Dict[str, CircuitBreaker] = {}
+        self._host_breakers: Dict[str, CircuitBreaker] = {}
+        # (échecs consécutifs, dernière erreur) tels qu'enregistrés en base, par URL
+        self._saved_failures: Dict[str, Tuple[int, Optional[str]]] = {}
+
+        parser_config = config.get('parser', {})
+        self.parser_workers = parser_config.get('workers', 2)
+        self._executor = self._create_executor(parser_config.get('executor', 'process'))
+
+    def _create_executor(self, kind: str) -> Executor:
+        """Pool de parsing : processus par défaut, threads en repli."""
+        if kind == 'process':
+            try:
+                # fork évite de ré-importer main.py (config, app, logs) dans chaque worker
+                context = None
+                if 'fork' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('fork')
+                executor = ProcessPoolExecutor(max_workers=self.parser_workers, mp_context=context)
+                # Les workers sont créés à la première tâche : on les force ici, tant que le
+                # processus n'a qu'un thread (forker après le démarrage des threads d'aiosqlite
+                # peut bloquer un worker sur un verrou hérité)
+                for _ in range(self.parser_workers):
+                    executor.submit(int)
+                return executor
+            except (OSError, NotImplementedError, ImportError) as e:
+                self.logger.warning(f"Process pool unavailable ({e}), parsing feeds in threads")
+        return ThreadPoolExecutor(max_workers=self.parser_workers, thread_name_prefix='feed_parser')
+
+    def close(self):
+        """Arrête le pool de parsing (les workers sont inactifs, l'attente est brève)."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
     async def set_session(self, session: aiohttp.ClientSession):
         self.session = session
 
-    async def fetch_feed(self, url: str) -> Optional[Dict]:
+    def load_validators(self, validators: Dict[str, Dict]):
+        """Charge les validateurs persistés en base (appelé au démarrage)."""
+        self._validators.update(validators)
+
+    def update_cache(self, feeds_data: Dict):
+        """
+        Mémorise les validateurs des flux sauvegardés.
+        Appelé uniquement après une sauvegarde réussie, pour ne jamais
+        répondre 304 sur un contenu qui n'aurait pas été enregistré.
+        """
+        for category_data in feeds_data.values():
+            for feed_data in category_data.get('feeds', {}).values():
+                feed_info = feed_data['feed_info']
+                self._validators[feed_info['url']] = {
+                    'etag': feed_info.get('etag'),
+                    'last_modified': feed_info.get('last_modified'),
+                    'content_hash': feed_info.get('content_hash')
+                }
+
+    def _get_feed_breaker(self, url: str) -> CircuitBreaker:
+        breaker = self._feed_breakers.get(url)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.breaker_cooldown)
+            self._feed_breakers[url] = breaker
+        return breaker
+
+    def _get_host_breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).hostname or ''
+        breaker = self._host_breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.host_failure_threshold, self.breaker_cooldown)
+            self._host_breakers[host] = breaker
+        return breaker
+
+    def load_feed_health(self, feed_health: Dict[str, Dict]):
+        """Recharge les compteurs d'échecs persistés (appelé au démarrage)."""
+        for url, health in feed_health.items():
+            self._get_feed_breaker(url).restore(
+                health['consecutive_failures'],
+                health['last_error'],
+                health['last_error_at'],
+                health['last_success_at']
+            )
+        self.mark_feed_health_saved(feed_health)
+
+    def get_feed_health(self, targets: List[Tuple[str, str]], changed_only: bool = False) -> Dict[str, Dict]:
+        """
+        État des disjoncteurs des flux demandés, à persister, indexé par URL. Avec changed_only,
+        seulement les flux dont le nombre d'échecs ou la dernière erreur diffère de l'état enregistré.
+        Chaque état porte aussi la configuration du flux : un flux qui n'a encore jamais
+        abouti n'a pas de ligne en base, elle est créée à partir de ces informations.
+        """
+        feed_health = {}
+        for category_key, feed_key in targets:
+            category_config = self.config['rss_feeds'][category_key]
+            feed_config = category_config['feeds'][feed_key]
+            breaker = self._feed_breakers.get(feed_config['url'])
+            if breaker is None:
+                continue
+            feed_health[feed_config['url']] = {
+                **breaker.to_dict(),
+                'category_key': category_key,
+                'category': category_config['category'],
+                'feed_key': feed_key,
+                'name': feed_config['name'],
+                'type': feed_config['type']
+            }
+        if changed_only:
+            feed_health = {
+                url: health for url, health in feed_health.items()
+                if self._saved_failures.get(url) != (health['consecutive_failures'], health['last_error'])
+            }
+        return feed_health
+
+    def mark_feed_health_saved(self, feed_health: Dict[str, Dict]):
+        """Mémorise l'état enregistré en base, référence de get_feed_health(changed_only=True)."""
+        for url, health in feed_health.items():
+            self._saved_failures[url] = (health['consecutive_failures'] or 0, health['last_error'])
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        validators = self._validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    async def fetch_feed(self, url: str) -> Dict:
+        """
+        Récupère un flux. Le dict retourné porte toujours un 'status'
+        ('updated', 'not_modified', 'unchanged' ou 'failed') et les
+        indications de fraîcheur envoyées par le serveur ('hints').
+        """
         if not self.session:
             self.logger.error("HTTP session not initialized")
-            return None
+            return self._failed_result(url, "HTTP session not initialized")
 
         try:
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    feed = feedparser.parse(content)
-                    return self._process_feed(feed, url)
+            # Timeouts de la session (http.feeds.timeout / connect_timeout)
+            async with self.session.get(url, headers=self._conditional_headers(url)) as response:
+                hints = self._parse_cache_hints(response.headers)
+
+                if response.status == 304:
+                    return {'status': 'not_modified', 'feed_info': {'url': url}, 'entries': [], 'hints': hints}
+                elif response.status == 200:
+                    content = await self._read_body(response)
+                    if content is None:
+                        self.logger.error(f"Feed {url} exceeds the {self.max_body_bytes} bytes limit")
+                        result = self._failed_result(url, f"Body larger than {self.max_body_bytes} bytes", hints)
+                        result['oversize'] = True
+                        return result
+
+                    content_hash = hashlib.sha256(content).hexdigest()
+                    if content_hash == self._validators.get(url, {}).get('content_hash'):
+                        return {'status': 'unchanged', 'feed_info': {'url': url}, 'entries': [], 'hints': hints}
+
+                    feed_data = await self._parse(content, url)
+                    feed_data['feed_info']['etag'] = response.headers.get('ETag')
+                    feed_data['feed_info']['last_modified'] = response.headers.get('Last-Modified')
+                    feed_data['feed_info']['content_hash'] = content_hash
+                    hints['ttl'] = feed_data.pop('ttl')
+                    feed_data['hints'] = hints
+                    return feed_data
                 else:
                     self.logger.error(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
+                    # 5xx / 429 : c'est l'hôte qui est en difficulté, pas seulement ce flux
+                    host_failure = response.status >= 500 or response.status == 429
+                    return self._failed_result(url, f"HTTP {response.status}", hints, host_failure)
         except Exception as e:
             self.logger.error(f"Error fetching {url}: {e}")
-            return None
+            return self._failed_result(url, str(e) or type(e).__name__, host_failure=True)
 
-    def _process_feed(self, feed, url: str) -> Dict:
-        entries = []
-        for entry in feed.entries[:20]:  # Limite à 20 entrées
-            processed_entry = {
-                'title': getattr(entry, 'title', 'No title'),
-                'link': getattr(entry, 'link', ''),
-                'summary': getattr(entry, 'summary', ''),
-                'published': self._parse_date(entry),
-                'id': getattr(entry, 'id', entry.link if hasattr(entry, 'link') else ''),
-                'author': getattr(entry, 'author', ''),
-            }
-            entries.append(processed_entry)
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Optional[bytes]:
+        """
+        Lit le corps par morceaux, sans jamais dépasser max_body_bytes en mémoire.
+        La lecture s'arrête dès que max_entries entrées complètes ont été reçues :
+        le document est alors tronqué après la dernière entrée et refermé.
+
+        Returns:
+            Le corps (éventuellement tronqué), ou None s'il dépasse la limite
+        """
+        buffer = bytearray()
+        entries_seen = 0
+        scan_from = 0
+
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            buffer.extend(chunk)
+
+            for match in ENTRY_END_PATTERN.finditer(buffer, scan_from):
+                if match.end() > self.max_body_bytes:
+                    return None
+                entries_seen += 1
+                scan_from = match.end()
+                if entries_seen >= self.max_entries:
+                    return self._close_truncated_document(bytes(buffer[:match.end()]), match.group(1))
+
+            if len(buffer) > self.max_body_bytes:
+                return None
 
+            # Une balise fermante peut être coupée entre deux morceaux
+            scan_from = max(scan_from, len(buffer) - MAX_ENTRY_END_LENGTH + 1)
+
+        return bytes(buffer)
+
+    def _close_truncated_document(self, content: bytes, entry_tag: bytes) -> bytes:
+        """Referme un document RSS 2.0 / Atom tronqué ; les autres formats passent par le mode tolérant de feedparser."""
+        head = content[:1024]
+        if entry_tag == b'item' and b'<rss' in head:
+            return content + b'</channel></rss>'
+        if entry_tag == b'entry' and b'<feed' in head:
+            return content + b'</feed>'
+        return content
+
+    async def _parse(self, content: bytes, url: str) -> Dict:
+        """Parse hors de la boucle asyncio ; seules les entrées normalisées reviennent du worker."""
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, parse_feed, content, url, self.max_entries)
+        except BrokenProcessPool:
+            # Les analyses concurrentes échouent ensemble : seule la première remplace le pool,
+            # les suivantes réutilisent les threads déjà créés
+            if self._executor is executor:
+                self.logger.error("Feed parser process pool broken, falling back to threads")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor('thread')
+            return await loop.run_in_executor(self._executor, parse_feed, content, url, self.max_entries)
+
+    def _failed_result(self, url: str, error: str, hints: Optional[Dict] = None, host_failure: bool = False) -> Dict:
         return {
-            'feed_info': {
-                'title': getattr(feed.feed, 'title', 'Unknown Feed'),
-                'description': getattr(feed.feed, 'description', ''),
-                'url': url,
-                'last_updated': datetime.now(timezone.utc).isoformat()
-            },
-            'entries': entries
+            'status': 'failed',
+            'error': error,
+            'host_failure': host_failure,
+            'feed_info': {'url': url},
+            'entries': [],
+            'hints': hints or {}
         }
 
-    def _parse_date(self, entry) -> str:
-        # Essayer plusieurs champs de date (RSS et Atom)
-        date_fields = [
-            ('published_parsed', 'published'),
-            ('updated_parsed', 'updated'),
-            ('created_parsed', 'created'),
-        ]
+    def _parse_cache_hints(self, headers) -> Dict[str, Optional[int]]:
+        """Extrait Cache-Control max-age et Retry-After (en secondes) des en-têtes de réponse."""
+        hints = {'max_age': None, 'retry_after': None, 'ttl': None}
 
-        for parsed_field, raw_field in date_fields:
-            # Essayer le champ parsé en premier
-            parsed_value = getattr(entry, parsed_field, None)
-            if parsed_value:
-                try:
-                    dt = datetime(*parsed_value[:6], tzinfo=timezone.utc)
-                    return dt.isoformat()
-                except (ValueError, TypeError, IndexError):
-                    pass
+        match = re.search(r'max-age\s*=\s*(\d+)', headers.get('Cache-Control', ''))
+        if match:
+            hints['max_age'] = int(match.group(1))
 
-            # Essayer le champ brut
-            raw_value = getattr(entry, raw_field, None)
-            if raw_value and isinstance(raw_value, str):
-                # Essayer de parser la date brute
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            if retry_after.strip().isdigit():
+                hints['retry_after'] = int(retry_after)
+            else:
                 try:
-                    from email.utils import parsedate_to_datetime
-                    dt = parsedate_to_datetime(raw_value)
-                    return dt.isoformat()
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    hints['retry_after'] = max(int(delay), 0)
                 except (ValueError, TypeError):
                     pass
-                # Retourner tel quel si c'est déjà au format ISO
-                if 'T' in raw_value or raw_value.count('-') >= 2:
-                    return raw_value
 
-        # Fallback: date actuelle
-        return datetime.now(timezone.utc).isoformat()
+        return hints
 
-    async def fetch_all_feeds(self) -> Dict[str, Dict]:
-        results = {}
+    def _get_host_semaphore(self, url: str) -> Optional[asyncio.Semaphore]:
+        """Semaphore limitant les requêtes simultanées vers un même hôte (None = illimité)."""
+        if not self.per_host_limit:
+            return None
+        host = urlsplit(url).hostname or ''
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._host_semaphores[host] = semaphore
+        return semaphore
 
-        for category_key, category_data in self.config['rss_feeds'].items():
-            results[category_key] = {
-                'category': category_data['category'],
-                'feeds': {}
+    def get_feed_targets(self) -> List[Tuple[str, str]]:
+        """Liste de tous les flux configurés, sous forme de (category_key, feed_key)."""
+        return [
+            (category_key, feed_key)
+            for category_key, category_data in self.config['rss_feeds'].items()
+            for feed_key in category_data['feeds']
+        ]
+
+    async def _fetch_limited(self, feed_config: Dict) -> Dict:
+        url = feed_config['url']
+        feed_breaker = self._get_feed_breaker(url)
+        host_breaker = self._get_host_breaker(url)
+
+        # Vérification et prise du créneau de test sans await entre les deux
+        if not (feed_breaker.is_available() and host_breaker.is_available()):
+            retry_in = max(feed_breaker.retry_in(), host_breaker.retry_in())
+            self.logger.info(f"Skipping {feed_config['name']}: circuit open")
+            return {
+                'status': 'skipped',
+                'feed_info': {'url': url},
+                'entries': [],
+                'hints': {'retry_after': int(retry_in) or None}
             }
+        feed_breaker.begin()
+        host_breaker.begin()
 
-            for feed_key, feed_config in category_data['feeds'].items():
-                self.logger.info(f"Fetching {feed_config['name']} from {feed_config['url']}")
-                feed_data = await self.fetch_feed(feed_config['url'])
+        host_semaphore = self._get_host_semaphore(url)
+        async with self._semaphore, host_semaphore or nullcontext():
+            self.logger.info(f"Fetching {feed_config['name']} from {url}")
+            result = await self.fetch_feed(url)
 
-                if feed_data:
-                    feed_data['feed_info']['name'] = feed_config['name']
-                    feed_data['feed_info']['type'] = feed_config['type']
-                    results[category_key]['feeds'][feed_key] = feed_data
-                else:
-                    self.logger.warning(f"Failed to fetch {feed_config['name']}")
+        if result['status'] == 'failed':
+            feed_breaker.record_failure(result['error'])
+            if result['host_failure']:
+                host_breaker.record_failure(result['error'])
+            else:
+                host_breaker.record_success()
+        else:
+            feed_breaker.record_success()
+            host_breaker.record_success()
 
-        return results
\ No newline at end of file
+        return result
+
+    async def fetch_feeds(self, targets: List[Tuple[str, str]]) -> Tuple[Dict[str, Dict], Dict[Tuple[str, str], Dict]]:
+        """
+        Récupère en parallèle les flux demandés.
+
+        Returns:
+            (results, outcomes) : results a la forme {category: {feeds: ...}} attendue
+            par save_feeds_data et ne contient que les flux modifiés ; outcomes donne,
+            pour chaque (category_key, feed_key), le status et les hints de la requête
+            ('skipped' si le disjoncteur du flux ou de son hôte est ouvert).
+        """
+        results = {}
+        rss_feeds = self.config['rss_feeds']
+
+        for category_key, _ in targets:
+            if category_key not in results:
+                results[category_key] = {
+                    'category': rss_feeds[category_key]['category'],
+                    'feeds': {}
+                }
+
+        # Tous les flux partent en parallèle, bornés par les sémaphores global et par hôte
+        fetched = await asyncio.gather(
+            *(self._fetch_limited(rss_feeds[category_key]['feeds'][feed_key]) for category_key, feed_key in targets)
+        )
+
+        outcomes = {}
+        stats = {
+            'total': len(targets), 'updated': 0, 'not_modified': 0, 'unchanged': 0,
+            'failed': 0, 'oversize': 0, 'skipped': 0
+        }
+        for (category_key, feed_key), feed_data in zip(targets, fetched):
+            feed_config = rss_feeds[category_key]['feeds'][feed_key]
+            status = feed_data['status']
+            stats[status] += 1
+            if feed_data.get('oversize'):
+                stats['oversize'] += 1
+            outcomes[(category_key, feed_key)] = {'status': status, 'hints': feed_data['hints']}
+
+            # not_modified / unchanged : rien de nouveau, pas de sauvegarde ni de diff Discord
+            if status == 'updated':
+                feed_data['feed_info']['name'] = feed_config['name']
+                feed_data['feed_info']['type'] = feed_config['type']
+                results[category_key]['feeds'][feed_key] = feed_data
+            elif status == 'failed':
+                self.logger.warning(f"Failed to fetch {feed_config['name']}")
+
+        self.last_cycle_stats = stats
+        for key, value in stats.items():
+            self.total_stats[key] = self.total_stats.get(key, 0) + value
+        self.logger.info(
+            f"Fetch cycle: {stats['updated']} updated, {stats['not_modified']} not modified (304), "
+            f"{stats['unchanged']} unchanged (same content), {stats['failed']} failed "
+            f"({stats['oversize']} over size limit), {stats['skipped']} skipped (circuit open)"
+        )
+
+        return results, outcomes
+
+    def get_stats(self) -> Dict:
+        """Compteurs du dernier cycle et cumulés depuis le démarrage (304, contenu inchangé, corps trop gros...)."""
+        return {
+            'last_cycle': self.last_cycle_stats,
+            'totals': self.total_stats
+        }
+
+    async def fetch_all_feeds(self) -> Dict[str, Dict]:
+        results, _ = await self.fetch_feeds(self.get_feed_targets())
+        return results
@@ -0,0 +1,159 @@
+"""
+Interface commune des backends de stockage.
+Le reste de l'application (fetch, outbox Discord, rétention, API) ne connaît
+que ces méthodes ; le backend est choisi par storage.backend dans config.json.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+class StorageBackend(ABC):
+    # Highlight markers placed around matched terms in search snippets, replaced by the API
+    SNIPPET_START = '\x02'
+    SNIPPET_END = '\x03'
+
+    # Set by connect() when full-text search is available
+    search_enabled = False
+
+    # Incremented when entries, categories or feeds are inserted or deleted, so cached
+    # entry listings can tell they are stale
+    generation = 0
+    # Also incremented by writes only visible in /status and /categories (feed health, last_update)
+    status_generation = 0
+
+    def _bump_generation(self, entries: bool = True):
+        """entries=False for writes that leave entries, categories and feeds rows unchanged."""
+        if entries:
+            self.generation += 1
+        self.status_generation += 1
+
+    @abstractmethod
+    async def connect(self):
+        """Open connections and create or migrate the schema."""
+
+    @abstractmethod
+    async def close(self):
+        """Close all connections."""
+
+    # ==================== Fetch cycle ====================
+
+    @abstractmethod
+    async def save_feeds_data(self, feeds_data: Dict, notify: bool = False) -> List[Tuple[int, str]]:
+        """
+        Save a fetch cycle in a single transaction. Returns the (feed_id, entry_id) pairs newly inserted.
+        With notify, new entries of feeds that already had entries are queued in the notification outbox.
+        """
+
+    @abstractmethod
+    async def get_feed_validators(self) -> Dict[str, Dict]:
+        """ETag, Last-Modified and content hash per feed URL."""
+
+    @abstractmethod
+    async def get_feed_health(self) -> Dict[str, Dict]:
+        """Persisted failure tracking per feed URL."""
+
+    @abstractmethod
+    async def update_feed_health(self, feed_health: Dict[str, Dict]):
+        """Persist failure counts, last error and last success per feed URL, creating missing feed rows."""
+
+    # ==================== Notification outbox ====================
+
+    @abstractmethod
+    async def claim_notifications(self, limit: int) -> List[Dict]:
+        """Claim a batch of due notifications with their entry data; they move to 'sending'."""
+
+    @abstractmethod
+    async def mark_notification_delivered(self, outbox_id: int, delivered_to: List[str]):
+        """Record the webhooks already delivered."""
+
+    @abstractmethod
+    async def complete_notification(self, outbox_id: int):
+        """Remove a fully delivered notification."""
+
+    @abstractmethod
+    async def retry_notification(self, outbox_id: int, delay: float, error: str, give_up: bool = False):
+        """Schedule another attempt after delay seconds, or mark the notification as failed."""
+
+    @abstractmethod
+    async def requeue_stale_notifications(self) -> int:
+        """Put back notifications left in 'sending' by a crash or restart. Returns their count."""
+
+    @abstractmethod
+    async def get_outbox_state(self) -> Dict:
+        """Number of pending notifications and epoch time of the next due one."""
+
+    # ==================== Retention ====================
+
+    @abstractmethod
+    async def get_expired_entry_ids(self, feed_type: str, cutoff_ts: Optional[int] = None,
+                                    max_rows: Optional[int] = None, keep_latest: int = 0) -> List[int]:
+        """Ids of the entries of a feed type outside a retention policy."""
+
+    @abstractmethod
+    async def delete_entries(self, entry_ids: List[int]) -> int:
+        """Delete entries by id, except those still waiting in the outbox. Returns the number deleted."""
+
+    @abstractmethod
+    async def purge_failed_notifications(self, older_than_days: float) -> int:
+        """Delete abandoned notifications older than the given age. Returns their count."""
+
+    @abstractmethod
+    async def incremental_vacuum(self, max_pages: int = 0) -> int:
+        """Give free space back to the filesystem. Returns the number of bytes reclaimed."""
+
+    @abstractmethod
+    async def get_storage_stats(self) -> Dict:
+        """size_bytes and free_bytes of the store."""
+
+    # ==================== Reads (API) ====================
+
+    @abstractmethod
+    async def get_latest_entries(self, limit: int = 500) -> List[Dict]:
+        """Latest entries, newest first."""
+
+    @abstractmethod
+    async def get_entries_page(self, limit: int = 100, categories: Optional[List[str]] = None,
+                               types: Optional[List[str]] = None, before: Optional[Tuple[int, int]] = None,
+                               since: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """Keyset pagination over entries, newest first, on (published_ts, seq)."""
+
+    @abstractmethod
+    async def get_new_entries_since(self, since_seq: int, limit: int = 500, categories: Optional[List[str]] = None,
+                                    types: Optional[List[str]] = None) -> List[Dict]:
+        """Entries inserted after a sequence number, in insertion order."""
+
+    @abstractmethod
+    async def get_last_entry_seq(self) -> int:
+        """Sequence number of the last inserted entry (0 if none)."""
+
+    @abstractmethod
+    async def get_entry(self, seq: int) -> Optional[Dict]:
+        """One entry with its full summary, None if it does not exist. Lists only carry summary_preview."""
+
+    @abstractmethod
+    async def search_entries(self, query: str, limit: int = 20, offset: int = 0,
+                             categories: Optional[List[str]] = None, types: Optional[List[str]] = None) -> List[Dict]:
+        """Full-text search, best matches first, with title_snippet and snippet."""
+
+    @abstractmethod
+    async def get_categories(self) -> Dict:
+        """All categories with feed and entry counts."""
+
+    @abstractmethod
+    async def get_status(self) -> Dict:
+        """Totals, entries per category and per type, and per-feed health."""
+
+
+def create_database(storage_config: Dict) -> StorageBackend:
+    """Instantiate the backend selected by storage.backend ('sqlite' by default, or 'postgres')."""
+    backend = storage_config.get('backend', 'sqlite')
+
+    if backend == 'sqlite':
+        from services.database import Database
+        return Database(storage_config.get('db_file', 'data/feeds.db'), storage_config.get('sqlite'))
+
+    if backend == 'postgres':
+        from services.postgres_database import PostgresDatabase
+        return PostgresDatabase(storage_config.get('postgres', {}))
+
+    raise ValueError(f"Unknown storage backend: {backend}")
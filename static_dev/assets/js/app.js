@@ -7,6 +7,17 @@ class ITMonitoring {
         this.lastSeenIds = this.loadLastSeenIds();
         this.loading = false;
         this.newCount = 0;
+        this.pageSize = 100;
+        this.nextCursor = null;
+        this.changesCursor = null;
+        this.searchQuery = '';
+        this.searchResults = null;
+        this.searchTimer = null;
+        // Dernière réponse et ETag par URL, pour les requêtes conditionnelles
+        this.responseCache = new Map();
+        // Connexion WebSocket des mises à jour en direct (null : repli sur le polling)
+        this.live = null;
+        this.liveRetryDelay = 1000;
 
         this.init();
     }
@@ -77,6 +88,7 @@ class ITMonitoring {
         this.bindEvents();
         await this.loadInitialData();
         this.checkUrlArticle();
+        this.connectLive();
     }
 
     checkUrlArticle() {
@@ -94,6 +106,7 @@ class ITMonitoring {
                     // Attendre la fin du scroll puis expand
                     setTimeout(() => {
                         item.classList.add('expanded', 'read');
+                        this.loadEntryBody(item);
                         this.markAsRead(articleId);
                         item.querySelector('.tag-new')?.remove();
                         this.updateNewCount();
@@ -116,6 +129,11 @@ class ITMonitoring {
         document.getElementById('refresh-btn').addEventListener('click', () => this.refresh());
         document.getElementById('mark-all-read')?.addEventListener('click', () => this.markAllAsRead());
 
+        document.getElementById('search-input')?.addEventListener('input', (e) => {
+            clearTimeout(this.searchTimer);
+            this.searchTimer = setTimeout(() => this.search(e.target.value), 250);
+        });
+
         document.addEventListener('change', (e) => {
             if (e.target.type === 'checkbox') {
                 this.handleFilterChange(e.target);
@@ -141,22 +159,41 @@ class ITMonitoring {
         }
     }
 
-    async loadStats() {
-        const res = await fetch('/api/feeds/status');
+    async fetchJson(url) {
+        // Renvoie l'ETag reçu : un 304 réutilise la réponse précédente sans la retélécharger
+        const cached = this.responseCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const res = await fetch(url, { headers, cache: 'no-store' });
+
+        if (res.status === 304 && cached) {
+            return cached.data;
+        }
+
         const data = await res.json();
+        const etag = res.headers.get('ETag');
+        if (res.ok && etag) {
+            this.responseCache.set(url, { etag, data });
+        }
+        return data;
+    }
+
+    async loadStats() {
+        const data = await this.fetchJson('/api/feeds/status');
 
         if (data.success) {
-            const s = data.status;
-            document.getElementById('stat-categories').textContent = s.total_categories;
-            document.getElementById('stat-feeds').textContent = s.total_feeds;
-            document.getElementById('stat-entries').textContent = s.total_entries;
-            document.getElementById('stat-update').textContent = this.formatDateShort(s.last_update);
+            this.renderStats(data.status);
         }
     }
 
+    renderStats(s) {
+        document.getElementById('stat-categories').textContent = s.total_categories;
+        document.getElementById('stat-feeds').textContent = s.total_feeds;
+        document.getElementById('stat-entries').textContent = s.total_entries;
+        document.getElementById('stat-update').textContent = this.formatDateShort(s.last_update);
+    }
+
     async loadCategories() {
-        const res = await fetch('/api/feeds/categories');
-        const data = await res.json();
+        const data = await this.fetchJson('/api/feeds/categories');
 
         if (data.success) {
             const container = document.getElementById('category-filters');
@@ -185,17 +222,43 @@ class ITMonitoring {
         }
     }
 
+    buildFilterParams() {
+        // Filtrage côté serveur : seules les entrées affichées sont téléchargées
+        const params = new URLSearchParams();
+        if (this.filters.categories.length > 0) {
+            params.set('category', this.filters.categories.join(','));
+        }
+        params.set('type', this.filters.types.join(','));
+        return params;
+    }
+
+    buildFeedsUrl(cursors = {}) {
+        const params = this.buildFilterParams();
+        params.set('limit', this.pageSize);
+        Object.entries(cursors).forEach(([key, value]) => params.set(key, value));
+        return `/api/feeds/latest?${params}`;
+    }
+
     async loadAllFeeds() {
         if (this.loading) return;
 
+        if (this.filters.types.length === 0) {
+            this.feeds = [];
+            this.nextCursor = null;
+            this.changesCursor = null;
+            this.render();
+            return;
+        }
+
         this.loading = true;
 
         try {
-            const res = await fetch('/api/feeds/latest?limit=500');
-            const data = await res.json();
+            const data = await this.fetchJson(this.buildFeedsUrl());
 
             if (data.success) {
-                this.feeds = data.entries;
+                this.feeds = data.entries.slice();
+                this.nextCursor = data.next_cursor;
+                this.changesCursor = data.changes_cursor;
                 this.render();
             }
         } catch (error) {
@@ -205,6 +268,104 @@ class ITMonitoring {
         }
     }
 
+    async loadMoreFeeds() {
+        if (this.loading || !this.nextCursor) return;
+
+        this.loading = true;
+
+        try {
+            const res = await fetch(this.buildFeedsUrl({ before: this.nextCursor }));
+            const data = await res.json();
+
+            if (data.success) {
+                this.feeds = this.feeds.concat(data.entries);
+                this.nextCursor = data.next_cursor;
+                this.render();
+            }
+        } catch (error) {
+            console.error('Error loading more feeds:', error);
+        } finally {
+            this.loading = false;
+        }
+    }
+
+    async loadChanges() {
+        if (this.loading) return;
+        if (this.changesCursor === null) return this.loadAllFeeds();
+        if (this.filters.types.length === 0) return;
+
+        this.loading = true;
+        let reload = false;
+
+        try {
+            // Seules les entrées insérées depuis le dernier curseur sont téléchargées
+            const known = new Set(this.feeds.map(f => f.seq));
+            let added = false;
+
+            for (let page = 0; page < 5; page++) {
+                const params = this.buildFilterParams();
+                params.set('since', this.changesCursor);
+                const res = await fetch(`/api/feeds/changes?${params}`);
+                const data = await res.json();
+                if (!data.success) break;
+
+                data.entries.forEach(entry => {
+                    if (!known.has(entry.seq)) {
+                        known.add(entry.seq);
+                        this.feeds.push(entry);
+                        added = true;
+                    }
+                });
+                this.changesCursor = data.cursor;
+
+                if (!data.has_more) break;
+                if (page === 4) reload = true;
+            }
+
+            if (added) {
+                this.feeds.sort((a, b) => (b.published_ts - a.published_ts) || (b.seq - a.seq));
+                this.render();
+            }
+        } catch (error) {
+            console.error('Error loading changes:', error);
+        } finally {
+            this.loading = false;
+        }
+
+        // Trop de retard : rechargement complet
+        if (reload) {
+            await this.loadAllFeeds();
+        }
+    }
+
+    // ==================== Search ====================
+
+    async search(query) {
+        this.searchQuery = query.trim();
+
+        if (!this.searchQuery) {
+            this.searchResults = null;
+            this.render();
+            return;
+        }
+
+        try {
+            const params = this.buildFilterParams();
+            params.set('q', this.searchQuery);
+            params.set('limit', 50);
+            const res = await fetch(`/api/feeds/search?${params}`);
+            const data = await res.json();
+
+            // Réponse d'une saisie déjà dépassée : ignorée
+            if (data.success && data.query === this.searchQuery) {
+                this.searchResults = data.entries;
+                this.render();
+            }
+        } catch (error) {
+            console.error('Search error:', error);
+        }
+    }
+
     // ==================== New Articles ====================
 
     checkNewArticles() {
@@ -242,7 +403,8 @@ class ITMonitoring {
 
     render() {
         const container = document.getElementById('feed-container');
-        const filtered = this.getFilteredFeeds();
+        const searching = this.searchResults !== null;
+        const filtered = searching ? this.searchResults : this.getFilteredFeeds();
 
         if (filtered.length === 0) {
             container.innerHTML = `
@@ -272,9 +434,21 @@ class ITMonitoring {
                 item.querySelector('.tag-new')?.remove();
                 item.classList.toggle('expanded');
                 this.updateNewCount();
+                if (item.classList.contains('expanded')) this.loadEntryBody(item);
             });
         });
 
+        if (this.nextCursor && !searching) {
+            container.insertAdjacentHTML('beforeend', `
+                <div class="load-more">
+                    <button class="btn" id="load-more-btn">
+                        <i class="fas fa-chevron-down"></i> Charger plus
+                    </button>
+                </div>
+            `);
+            document.getElementById('load-more-btn').addEventListener('click', () => this.loadMoreFeeds());
+        }
+
         this.updateNewCount();
     }
 
@@ -284,7 +458,7 @@ class ITMonitoring {
         const typeIcon = this.getTypeIcon(feed.feed_type);
 
         return `
-            <article class="feed-item ${isRead ? 'read' : ''}" data-index="${index}" data-id="${feed.id}">
+            <article class="feed-item ${isRead ? 'read' : ''}" data-index="${index}" data-id="${feed.id}" data-seq="${feed.seq}">
                 <div class="feed-item-header">
                     <div class="feed-item-tags">
                         <span class="tag tag-category">
@@ -304,14 +478,14 @@ class ITMonitoring {
                 </div>
                 <h3 class="feed-item-title">
                     <a href="${this.escapeHtml(feed.link)}" target="_blank" rel="noopener">
-                        ${this.escapeHtml(feed.title)}
+                        ${feed.title_snippet ?? this.escapeHtml(feed.title)}
                         <i class="fas fa-external-link-alt"></i>
                     </a>
                 </h3>
-                <p class="feed-item-preview">${this.getPreview(feed.summary)}</p>
+                <p class="feed-item-preview">${feed.snippet ?? this.escapeHtml(feed.summary_preview ?? this.getPreview(feed.summary))}</p>
                 <div class="feed-item-content">
                     <div class="feed-item-body">
-                        ${feed.summary || '<p>Pas de contenu disponible.</p>'}
+                        ${this.renderFeedBody(feed)}
                     </div>
                 </div>
                 <div class="feed-item-footer">
@@ -382,7 +556,11 @@ class ITMonitoring {
         }
 
         this.saveFilters();
-        this.render();
+        this.sendLiveFilters();
+        this.loadAllFeeds();
+        if (this.searchQuery) {
+            this.search(this.searchQuery);
+        }
     }
 
     // ==================== Actions ====================
@@ -404,6 +582,86 @@ class ITMonitoring {
         }
     }
 
+    async poll() {
+        try {
+            await this.loadChanges();
+            await this.loadStats();
+            this.checkNewArticles();
+            this.setStatus(true);
+        } catch (error) {
+            console.error('Poll error:', error);
+            this.setStatus(false);
+        }
+    }
+
+    // ==================== Live updates ====================
+
+    connectLive() {
+        if (!('WebSocket' in window)) return;
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const ws = new WebSocket(`${protocol}//${window.location.host}/api/feeds/live`);
+
+        ws.addEventListener('open', () => {
+            this.live = ws;
+            this.liveRetryDelay = 1000;
+            this.sendLiveFilters();
+            // Rattrape ce qui a été inséré avant l'ouverture de la connexion
+            this.loadChanges();
+            this.setStatus(true);
+        });
+
+        ws.addEventListener('message', (event) => {
+            try {
+                this.handleLiveMessage(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Live message error:', error);
+            }
+        });
+
+        ws.addEventListener('close', () => {
+            // Le polling reprend tant que la connexion n'est pas rétablie
+            this.live = null;
+            setTimeout(() => this.connectLive(), this.liveRetryDelay);
+            this.liveRetryDelay = Math.min(this.liveRetryDelay * 2, 60 * 1000);
+        });
+    }
+
+    sendLiveFilters() {
+        if (!this.live || this.live.readyState !== WebSocket.OPEN) return;
+        this.live.send(JSON.stringify({
+            category: this.filters.categories.join(','),
+            type: this.filters.types.join(',')
+        }));
+    }
+
+    handleLiveMessage(message) {
+        if (message.type !== 'update') return;
+
+        if (message.status) {
+            this.renderStats(message.status);
+        }
+
+        // Chargement en cours ou retard : les entrées sont récupérées par /changes depuis le curseur
+        if (this.loading || message.has_more || this.filters.types.length === 0) {
+            if (this.filters.types.length > 0) {
+                setTimeout(() => this.loadChanges(), 1000);
+            }
+            return;
+        }
+
+        const known = new Set(this.feeds.map(f => f.seq));
+        const added = message.entries.filter(entry => !known.has(entry.seq));
+        this.changesCursor = Math.max(this.changesCursor ?? 0, message.cursor);
+
+        if (added.length > 0) {
+            this.feeds = this.feeds.concat(added);
+            this.feeds.sort((a, b) => (b.published_ts - a.published_ts) || (b.seq - a.seq));
+            this.render();
+            this.checkNewArticles();
+        }
+    }
+
     setStatus(online) {
         const status = document.getElementById('status');
         if (online) {
@@ -494,6 +752,32 @@ class ITMonitoring {
         return icons[type] || 'fas fa-rss';
     }
 
+    renderFeedBody(feed) {
+        // Les listes ne contiennent que l'aperçu : le corps complet est chargé à l'ouverture
+        if (feed.summary !== undefined) {
+            return feed.summary || '<p>Pas de contenu disponible.</p>';
+        }
+        return '<p class="feed-item-loading">Chargement…</p>';
+    }
+
+    async loadEntryBody(item) {
+        const seq = Number(item.dataset.seq);
+        const feed = (this.searchResults || this.feeds).find(f => f.seq === seq);
+        if (!feed || feed.summary !== undefined) return;
+
+        const body = item.querySelector('.feed-item-body');
+        try {
+            const response = await fetch(`/api/feeds/entry/${seq}`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const data = await response.json();
+            feed.summary = data.entry.summary || '';
+            body.innerHTML = this.renderFeedBody(feed);
+        } catch (error) {
+            console.error('Error loading entry:', error);
+            body.innerHTML = feed.snippet || this.escapeHtml(feed.summary_preview) || '<p>Pas de contenu disponible.</p>';
+        }
+    }
+
     getPreview(html) {
         if (!html) return '';
         // Strip HTML tags and get plain text
@@ -521,9 +805,9 @@ document.addEventListener('DOMContentLoaded', () => {
     window.app = new ITMonitoring();
 });
 
-// Auto-refresh every 5 minutes
+// Auto-refresh every 5 minutes (new entries only), when live updates are not connected
 setInterval(() => {
-    if (window.app && !window.app.loading) {
-        window.app.refresh();
+    if (window.app && !window.app.loading && !window.app.live) {
+        window.app.poll();
     }
 }, 5 * 60 * 1000);
@@ -0,0 +1,44 @@
+"""
+Compression des réponses HTTP.
+L'encodage est négocié avec l'en-tête Accept-Encoding du client : brotli si le
+module est installé (il l'est avec aiohttp[speedups]), sinon gzip.
+"""
+import gzip
+from typing import Dict, Optional
+
+from werkzeug.datastructures import Accept
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compressor:
+    """Choisit et applique l'encodage des réponses selon config.json."""
+
+    DEFAULTS = {
+        'enabled': True,
+        'min_size': 1024,
+        'gzip_level': 6,
+        'brotli_quality': 5
+    }
+
+    def __init__(self, compression_config: Optional[Dict] = None):
+        self.compression_config = {**self.DEFAULTS, **(compression_config or {})}
+        self.enabled = self.compression_config['enabled']
+        self.min_size = self.compression_config['min_size']
+        # Par ordre de préférence, à q égal dans Accept-Encoding
+        self.encodings = ['br', 'gzip'] if brotli else ['gzip']
+
+    def negotiate(self, accept_encodings: Accept, size: int) -> Optional[str]:
+        """Encodage à utiliser pour un corps de size octets, None pour l'envoyer tel quel."""
+        if not self.enabled or size < self.min_size:
+            return None
+        return accept_encodings.best_match(self.encodings)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.compression_config['brotli_quality'])
+        # mtime fixe : le même corps donne toujours les mêmes octets
+        return gzip.compress(body, compresslevel=self.compression_config['gzip_level'], mtime=0)
@@ -20,13 +20,22 @@ def _default(obj):
 class OrjsonProvider(JSONProvider):
     mimetype = "application/json"
 
+    def __init__(self, app, indent: bool = False):
+        super().__init__(app)
+        # Sortie compacte par défaut, indentée seulement en développement
+        self.option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+
     def dumps(self, obj, **kwargs) -> str:
-        # orjson.dumps → bytes, donc on décode en str
+        # Interface JSONProvider (templates, tojson) : une str est attendue
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def encode(self, obj) -> bytes:
+        """Corps de réponse : bytes d'orjson tels quels, retour à la ligne ajouté par orjson."""
         return orjson.dumps(
             obj,
             default=_default,
-            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2,
-        ).decode()
+            option=self.option | orjson.OPT_APPEND_NEWLINE,
+        )
 
     def loads(self, s, **kwargs):
         return orjson.loads(s)
@@ -34,6 +43,6 @@ class OrjsonProvider(JSONProvider):
     def response(self, *args, **kwargs):
         obj = self._prepare_response_obj(args, kwargs)
         return self._app.response_class(
-            self.dumps(obj) + "\n",
+            self.encode(obj),
             mimetype=self.mimetype,
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,112 @@
+"""
+Cache mémoire des réponses JSON de l'API.
+Les réponses sont stockées déjà encodées avec leur ETag et leurs versions
+compressées, par clé (endpoint + paramètres normalisés), avec éviction LRU
+sous une limite en octets. Chaque réponse garde la génération des données
+dont elle dépend (entrées, ou statut des flux) : elle est périmée dès que
+cette génération change ; le TTL borne la fraîcheur quand d'autres instances
+écrivent dans la même base.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """Cache LRU de réponses encodées, invalidées par génération des données."""
+
+    DEFAULTS = {
+        'enabled': True,
+        'max_bytes': 16 * 1024 * 1024,
+        'ttl': 60
+    }
+
+    def __init__(self, cache_config: Optional[Dict] = None):
+        self.cache_config = {**self.DEFAULTS, **(cache_config or {})}
+        self.enabled = self.cache_config['enabled']
+        self.max_bytes = self.cache_config['max_bytes']
+        self.ttl = self.cache_config['ttl']
+        # clé -> (instant de stockage, génération, corps encodé, ETag, corps compressés par encodage),
+        # du moins au plus récemment utilisé
+        self._entries: 'OrderedDict[Hashable, Tuple[float, int, bytes, str, Dict[str, bytes]]]' = OrderedDict()
+        self._size = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def get(self, key: Hashable, generation: int) -> Optional[Tuple[bytes, str]]:
+        """(corps encodé, ETag) de la réponse, ou None si absente, expirée ou d'une génération précédente."""
+        if not self.enabled:
+            return None
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[1] != generation:
+            self._remove(key)
+            self.stats['invalidations'] += 1
+            cached = None
+        elif cached is not None and self.ttl and time.monotonic() - cached[0] > self.ttl:
+            self._remove(key)
+            cached = None
+        if cached is None:
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return cached[2], cached[3]
+
+    def get_variant(self, key: Hashable, encoding: str) -> Optional[bytes]:
+        """Version compressée d'une réponse en cache, si elle a déjà été calculée."""
+        cached = self._entries.get(key)
+        return cached[4].get(encoding) if cached else None
+
+    def add_variant(self, key: Hashable, encoding: str, data: bytes):
+        """Ajoute la version compressée d'une réponse en cache, comptée dans la limite en octets."""
+        cached = self._entries.get(key)
+        if cached is None or encoding in cached[4]:
+            return
+        cached[4][encoding] = data
+        self._size += len(data)
+        self._evict()
+
+    def put(self, key: Hashable, generation: int, body: bytes, etag: str):
+        """
+        Stocke une réponse encodée. generation doit être lue avant la requête en base :
+        une écriture survenue entre-temps rend la réponse périmée dès la lecture suivante.
+        """
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic(), generation, body, etag, {})
+        self._size += len(body)
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key: Hashable):
+        _, _, body, _, variants = self._entries.pop(key)
+        self._size -= len(body) + sum(len(data) for data in variants.values())
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'size_bytes': self._size,
+            'max_bytes': self.max_bytes,
+            **self.stats
+        }
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag fort dérivé du contenu : identique d'une instance et d'un redémarrage à l'autre."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()